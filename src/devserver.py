@@ -0,0 +1,256 @@
+import hashlib
+import mimetypes
+import os
+import sys
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+
+from gencontent import render_page
+from highlight import use_cache_dir
+from includes import FragmentRenderer
+
+LIVERELOAD_PATH = "/__livereload"
+LIVERELOAD_SCRIPT = (
+    "<script>new EventSource(\"" + LIVERELOAD_PATH + "\")"
+    ".onmessage = function () { location.reload(); };</script>"
+)
+
+
+class PageCache:
+    #LRU cache of rendered pages. An entry is only reused while the mtimes of
+    #the source file and the template still match the ones it was rendered from.
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, path, mtimes):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != mtimes:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, path, mtimes, body, etag):
+        with self._lock:
+            self._entries[path] = (mtimes, body, etag)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DevServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self, address, dir_path_content, dir_path_static, template_path,
+        cache_size=256, live_reload=True, highlight_cache_dir=None,
+    ):
+        super().__init__(address, DevRequestHandler)
+        use_cache_dir(highlight_cache_dir)
+        self.dir_path_content = dir_path_content
+        self.dir_path_static = dir_path_static
+        self.template_path = template_path
+        self.live_reload = live_reload
+        self.cache = PageCache(cache_size)
+        self.includes = FragmentRenderer(os.path.dirname(os.path.abspath(dir_path_content)))
+
+    def content_path(self, url_path):
+        #Maps "/" to index.md, "/blog/" to blog/index.md and "/x.html" to x.md
+        if url_path.endswith("/"):
+            rel_path = url_path[1:] + "index.md"
+        elif url_path.endswith(".html"):
+            rel_path = url_path[1:-len(".html")] + ".md"
+        else:
+            return None
+        return safe_join(self.dir_path_content, rel_path)
+
+    def include_mtimes(self, path):
+        #Every file the page includes, as of its last render
+        mtimes = []
+        for included in sorted(self.includes.graph.includes(os.path.normpath(path))):
+            try:
+                mtimes.append(os.stat(included).st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(-1)
+        return tuple(mtimes)
+
+    def source_mtimes(self, path):
+        #The page, the template and every file the page includes
+        return (os.stat(path).st_mtime_ns, os.stat(self.template_path).st_mtime_ns) + self.include_mtimes(path)
+
+    def render(self, path):
+        #Returns (body, etag) for a markdown page, rendering only on a cache miss
+        mtimes = self.source_mtimes(path)
+        cached = self.cache.get(path, mtimes)
+        if cached is not None:
+            return cached
+        with open(path, encoding="utf-8") as f:
+            markdown = f.read()
+        with open(self.template_path, encoding="utf-8") as f:
+            template = f.read()
+        _, page = render_page(markdown, template, includes=self.includes, path=path)
+        if self.live_reload:
+            page = page.replace("</body>", LIVERELOAD_SCRIPT + "</body>", 1)
+        body = page.encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        #The page and template mtimes are the ones read before rendering, so an
+        #edit made during the render still invalidates the entry. Only the
+        #include part is refreshed, since the include graph may have changed.
+        self.cache.put(path, mtimes[:2] + self.include_mtimes(path), body, etag)
+        return body, etag
+
+    def latest_mtime(self):
+        #Content, static files, the template and every included file, since
+        #snippets may live outside the content directory
+        latest = os.stat(self.template_path).st_mtime_ns
+        for directory in (self.dir_path_content, self.dir_path_static):
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    latest = max(latest, os.stat(os.path.join(root, name)).st_mtime_ns)
+        for included in set().union(*self.includes.graph.edges.values()):
+            try:
+                latest = max(latest, os.stat(included).st_mtime_ns)
+            except FileNotFoundError:
+                pass
+        return latest
+
+
+def safe_join(directory, rel_path):
+    #Joins rel_path onto directory, refusing paths that escape it
+    root = os.path.abspath(directory)
+    path = os.path.abspath(os.path.join(root, rel_path))
+    if path != root and not path.startswith(root + os.sep):
+        return None
+    return path
+
+
+class DevRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self.handle_get(send_body=False)
+
+    def do_GET(self):
+        self.handle_get(send_body=True)
+
+    def handle_get(self, send_body):
+        url_path = self.path.split("?", 1)[0]
+        if url_path == LIVERELOAD_PATH and self.server.live_reload:
+            self.send_live_reload()
+            return
+
+        page_path = self.server.content_path(url_path)
+        if page_path is not None and os.path.isfile(page_path):
+            try:
+                body, etag = self.server.render(page_path)
+            except Exception as e:
+                self.send_render_error(page_path, e, send_body)
+                return
+            if self.not_modified(etag):
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+            return
+
+        static_path = safe_join(self.server.dir_path_static, url_path.lstrip("/"))
+        if static_path is not None and os.path.isfile(static_path):
+            self.send_static(static_path, send_body)
+            return
+
+        self.send_error(404, "Not Found")
+
+    def send_render_error(self, path, error, send_body):
+        #Shows the error in the browser instead of dropping the connection
+        message = f"error rendering {path}: {type(error).__name__}: {error}"
+        self.log_error("%s", message)
+        body = message.encode("utf-8")
+        self.send_response(500)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def not_modified(self, etag):
+        if self.headers.get("If-None-Match") != etag:
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return True
+
+    def send_static(self, path, send_body):
+        stat = os.stat(path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        if self.not_modified(etag):
+            return
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(stat.st_size))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        if send_body:
+            self.wfile.flush()
+            with open(path, "rb") as f:
+                self.connection.sendfile(f)
+
+    def send_live_reload(self):
+        #Server-sent events stream that fires "reload" when any source changes
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.close_connection = True
+        last = self.server.latest_mtime()
+        try:
+            self.wfile.write(b"retry: 1000\n\n")
+            self.wfile.flush()
+            while True:
+                time.sleep(0.5)
+                latest = self.server.latest_mtime()
+                if latest != last:
+                    last = latest
+                    self.wfile.write(b"data: reload\n\n")
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f" * {format % args}\n")
+
+
+def serve(
+    port=8888, dir_path_content="./content", dir_path_static="./static", template_path="./template.html",
+    highlight_cache_dir="./.cache/highlight",
+):
+    server = DevServer(
+        ("", port), dir_path_content, dir_path_static, template_path, highlight_cache_dir=highlight_cache_dir
+    )
+    print(f"Serving on http://localhost:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else 8888)
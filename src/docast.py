@@ -0,0 +1,408 @@
+from array import array
+
+from frontmatter import split_front_matter
+from headings import HeadingCollector
+from highlight import highlight
+from htmlnode import LeafNode, ParentNode, StreamingParentNode
+from inline_markdown import text_to_textnodes
+from markdown_blocks import (
+    INLINE_MARKUP_CHARS,
+    BlockType,
+    block_to_block_type,
+    table_alignments,
+    table_row_spans,
+)
+from textnode import TextType
+
+#Node kinds. Container kinds hold children; the rest are leaves whose text is
+#the [start, end) range of the shared buffer.
+ROOT = 0
+PARAGRAPH = 1
+HEADING = 2
+QUOTE = 3
+OLIST = 4
+ULIST = 5
+LIST_ITEM = 6
+CODE_BLOCK = 7
+TEXT = 8
+BOLD = 9
+ITALIC = 10
+CODE = 11
+LINK = 12
+IMAGE = 13
+TABLE = 14
+TABLE_HEAD = 15
+TABLE_BODY = 16
+TABLE_ROW = 17
+TABLE_HEADER_CELL = 18
+TABLE_CELL = 19
+
+CONTAINER_TAGS = {
+    ROOT: "div",
+    PARAGRAPH: "p",
+    QUOTE: "blockquote",
+    OLIST: "ol",
+    ULIST: "ul",
+    LIST_ITEM: "li",
+    TABLE: "table",
+    TABLE_HEAD: "thead",
+    TABLE_BODY: "tbody",
+    TABLE_ROW: "tr",
+    TABLE_HEADER_CELL: "th",
+    TABLE_CELL: "td",
+}
+
+LEAF_TAGS = {
+    TEXT: None,
+    BOLD: "b",
+    ITALIC: "i",
+    CODE: "code",
+    LINK: "a",
+    IMAGE: "img",
+}
+
+TEXT_TYPE_KINDS = {
+    TextType.TEXT: TEXT,
+    TextType.BOLD: BOLD,
+    TextType.ITALIC: ITALIC,
+    TextType.CODE: CODE,
+    TextType.LINK: LINK,
+    TextType.IMAGE: IMAGE,
+}
+
+
+class Document:
+    #A parsed page stored as parallel arrays indexed by node number. Nodes are
+    #in document order, so a parent always comes before its children and every
+    #pass or serializer can be a single linear sweep. Text is never copied into
+    #nodes: leaves point into buffer, which is the markdown source followed by
+    #any normalized text (e.g. joined paragraph lines) that is not a slice of it.
+    def __init__(self, source):
+        self.source = source
+        self.kind = array("B")
+        self.parent = array("i")
+        self.start = array("i")
+        self.end = array("i")
+        self.props = {}  #node -> HTML attributes, only for nodes that have any
+        self.info = {}  #node -> non-HTML data such as heading level or code language
+        self._extra = []
+        self._extra_len = 0
+        self.buffer = source
+
+    def __len__(self):
+        return len(self.kind)
+
+    def add(self, kind, parent, start=-1, end=-1, props=None, info=None):
+        self.kind.append(kind)
+        self.parent.append(parent)
+        self.start.append(start)
+        self.end.append(end)
+        index = len(self.kind) - 1
+        if props:
+            self.props[index] = props
+        if info:
+            self.info[index] = info
+        return index
+
+    def intern(self, text):
+        #Appends text that is not a slice of the source, returning its offset
+        offset = len(self.source) + self._extra_len
+        self._extra.append(text)
+        self._extra_len += len(text)
+        return offset
+
+    def finish(self):
+        if self._extra:
+            self.buffer = self.source + "".join(self._extra)
+            self._extra = []
+
+    def text(self, index):
+        return self.buffer[self.start[index] : self.end[index]]
+
+
+def _iter_blocks(markdown, offset):
+    #Same split as markdown_to_blocks, but also yields each block's offset
+    for raw in markdown.split("\n\n"):
+        if raw != "":
+            yield offset + len(raw) - len(raw.lstrip()), raw.strip()
+        offset += len(raw) + 2
+
+
+def _add_inline(doc, parent, text, offset):
+    #text_to_textnodes gives back pieces of text in order, so each one is found
+    #by scanning forward from the end of the previous piece.
+    pos = 0
+    for text_node in text_to_textnodes(text):
+        index = text.find(text_node.text, pos)
+        pos = index + len(text_node.text)
+        kind = TEXT_TYPE_KINDS[text_node.text_type]
+        props = None
+        if kind == LINK:
+            props = {"href": text_node.url}
+        elif kind == IMAGE:
+            props = {"src": text_node.url, "alt": text_node.text}
+        doc.add(kind, parent, offset + index, offset + pos, props)
+
+
+def _add_joined_inline(doc, parent, block, offset, content):
+    #Uses the source range when the content is an untouched slice of it
+    if content == block:
+        _add_inline(doc, parent, content, offset)
+    else:
+        _add_inline(doc, parent, content, doc.intern(content))
+
+
+def _add_table_row(doc, parent, line, offset, kind, alignments):
+    row = doc.add(TABLE_ROW, parent)
+    spans = table_row_spans(line)[: len(alignments)]
+    spans.extend([(len(line), len(line))] * (len(alignments) - len(spans)))
+    for i, (start, end) in enumerate(spans):
+        props = {"align": alignments[i]} if alignments[i] else None
+        cell = doc.add(kind, row, props=props)
+        text = line[start:end]
+        if "\\|" in text:
+            text = text.replace("\\|", "|")
+            cell_offset = doc.intern(text)
+        else:
+            cell_offset = offset + start
+        if any(char in text for char in INLINE_MARKUP_CHARS):
+            _add_inline(doc, cell, text, cell_offset)
+        else:
+            doc.add(TEXT, cell, cell_offset, cell_offset + len(text))
+
+
+def _add_table(doc, block, offset):
+    lines = block.split("\n")
+    alignments = table_alignments(lines[1])
+    if len(alignments) != len(table_row_spans(lines[0])):
+        raise ValueError("invalid table, delimiter row does not match header")
+    table = doc.add(TABLE, 0)
+    _add_table_row(doc, doc.add(TABLE_HEAD, table), lines[0], offset, TABLE_HEADER_CELL, alignments)
+    line_offset = offset + len(lines[0]) + len(lines[1]) + 2
+    if len(lines) > 2:
+        body = doc.add(TABLE_BODY, table)
+        for line in lines[2:]:
+            _add_table_row(doc, body, line, line_offset, TABLE_CELL, alignments)
+            line_offset += len(line) + 1
+
+
+def _add_block(doc, block, offset):
+    block_type = block_to_block_type(block)
+    if block_type == BlockType.PARAGRAPH:
+        node = doc.add(PARAGRAPH, 0)
+        _add_joined_inline(doc, node, block, offset, " ".join(block.split("\n")))
+    elif block_type == BlockType.HEADING:
+        level = len(block) - len(block.lstrip("#"))
+        if level + 1 >= len(block):
+            raise ValueError(f"invalid heading level: {level}")
+        node = doc.add(HEADING, 0, info={"level": level})
+        _add_inline(doc, node, block[level + 1 :], offset + level + 1)
+    elif block_type == BlockType.CODE:
+        info, _, text = block[3:-3].partition("\n")
+        language = info.strip().split(" ")[0].lower()
+        start = offset + 3 + len(info) + 1
+        doc.add(CODE_BLOCK, 0, start, start + len(text), info={"language": language})
+    elif block_type == BlockType.QUOTE:
+        content = " ".join(line.lstrip(">").strip() for line in block.split("\n"))
+        node = doc.add(QUOTE, 0)
+        _add_inline(doc, node, content, doc.intern(content))
+    elif block_type in (BlockType.OLIST, BlockType.ULIST):
+        marker = 3 if block_type == BlockType.OLIST else 2
+        node = doc.add(OLIST if block_type == BlockType.OLIST else ULIST, 0)
+        line_offset = offset
+        for line in block.split("\n"):
+            item = doc.add(LIST_ITEM, node)
+            _add_inline(doc, item, line[marker:], line_offset + marker)
+            line_offset += len(line) + 1
+    elif block_type == BlockType.TABLE:
+        _add_table(doc, block, offset)
+    else:
+        raise ValueError("invalid block type")
+
+
+def parse_document(markdown, headings=None):
+    #The one markdown parser; markdown_blocks' HTMLNode functions are views of
+    #its output. Heading ids are given by the add_heading_ids pass, so pass a
+    #HeadingCollector to get the ids and TOC back.
+    doc = Document(markdown)
+    _, body = split_front_matter(markdown)
+    doc.add(ROOT, -1)
+    for offset, block in _iter_blocks(body, len(markdown) - len(body)):
+        _add_block(doc, block, offset)
+    doc.finish()
+    add_heading_ids(doc, headings)
+    return doc
+
+
+def parse_block(block, headings=None):
+    #A document holding one block, for callers that split blocks themselves
+    #(such as include expansion) but share one page's HeadingCollector
+    doc = Document(block)
+    doc.add(ROOT, -1)
+    _add_block(doc, block, 0)
+    doc.finish()
+    add_heading_ids(doc, headings)
+    return doc
+
+
+def _props_to_html(props):
+    if props is None:
+        return ""
+    return "".join(f' {prop}="{value}"' for prop, value in props.items())
+
+
+def _code_html(doc, index):
+    text = doc.text(index)
+    language = doc.info[index]["language"]
+    highlighted = highlight(text, language)
+    if highlighted is None:
+        return "<pre><code>" + text + "</code></pre>"
+    props = dict(doc.props.get(index, {}))
+    props.setdefault("class", f"language-{language}")
+    return f"<pre><code{_props_to_html(props)}>{highlighted}</code></pre>"
+
+
+def _tag(doc, index):
+    kind = doc.kind[index]
+    if kind == HEADING:
+        return f"h{doc.info[index]['level']}"
+    return CONTAINER_TAGS[kind]
+
+
+def to_html(doc):
+    #Writes HTML straight from the arrays, keeping a stack of open containers
+    out = []
+    stack = []
+    kinds = doc.kind
+    parents = doc.parent
+    for index in range(len(kinds)):
+        parent = parents[index]
+        while stack and stack[-1] != parent:
+            out.append(f"</{_tag(doc, stack.pop())}>")
+        kind = kinds[index]
+        props = doc.props.get(index)
+        if kind == CODE_BLOCK:
+            out.append(_code_html(doc, index))
+        elif kind in LEAF_TAGS:
+            tag = LEAF_TAGS[kind]
+            text = doc.text(index) if kind != IMAGE else ""
+            if tag is None:
+                out.append(text)
+            else:
+                out.append(f"<{tag}{_props_to_html(props)}>{text}</{tag}>")
+        else:
+            out.append(f"<{_tag(doc, index)}{_props_to_html(props)}>")
+            stack.append(index)
+    while stack:
+        out.append(f"</{_tag(doc, stack.pop())}>")
+    return "".join(out)
+
+
+def _subtree_end(doc, index):
+    #Nodes are in document order, so a subtree ends at the first later node
+    #whose parent comes before it
+    end = index + 1
+    while end < len(doc) and doc.parent[end] >= index:
+        end += 1
+    return end
+
+
+def _html_node(doc, index):
+    kind = doc.kind[index]
+    props = doc.props.get(index)
+    if kind == CODE_BLOCK:
+        text = doc.text(index)
+        language = doc.info[index]["language"]
+        highlighted = highlight(text, language)
+        if highlighted is None:
+            code = ParentNode("code", [LeafNode(None, text)])
+        else:
+            code_props = dict(props or {})
+            code_props.setdefault("class", f"language-{language}")
+            code = ParentNode("code", [LeafNode(None, highlighted)], code_props)
+        return ParentNode("pre", [code])
+    if kind in LEAF_TAGS:
+        return LeafNode(LEAF_TAGS[kind], doc.text(index) if kind != IMAGE else "", props)
+    if kind == TABLE_BODY:
+        return StreamingParentNode("tbody", lambda: _table_rows(doc, index), props)
+    return ParentNode(_tag(doc, index), [], props)
+
+
+def _table_rows(doc, body):
+    #Builds each row's nodes only as the row is serialized
+    index = body + 1
+    end = _subtree_end(doc, body)
+    while index < end:
+        row_end = _subtree_end(doc, index)
+        yield _subtree_html_node(doc, index, row_end)
+        index = row_end
+
+
+def _subtree_html_node(doc, root, end):
+    nodes = {}
+    index = root
+    while index < end:
+        node = _html_node(doc, index)
+        nodes[index] = node
+        if index != root:
+            nodes[doc.parent[index]].children.append(node)
+        if isinstance(node, StreamingParentNode):
+            index = _subtree_end(doc, index)
+        else:
+            index += 1
+    return nodes[root]
+
+
+def to_html_node(doc):
+    #The HTMLNode view of a document: the equivalent ParentNode/LeafNode tree,
+    #with table bodies streaming their rows
+    return _subtree_html_node(doc, 0, len(doc))
+
+
+def add_heading_ids(doc, headings=None):
+    #Assigns heading ids from the current heading text; parsing runs it once,
+    #and it can run again after passes that change headings. Returns the
+    #HeadingCollector with the TOC.
+    if headings is None:
+        headings = HeadingCollector()
+    heading = -1
+    parts = []
+
+    def finish():
+        level = doc.info[heading]["level"]
+        doc.props.setdefault(heading, {})["id"] = headings.add(level, "".join(parts))
+
+    for index in range(len(doc)):
+        if doc.parent[index] == heading and doc.kind[index] in LEAF_TAGS:
+            parts.append(doc.text(index))
+        elif doc.kind[index] == HEADING:
+            if heading >= 0:
+                finish()
+            heading = index
+            parts = []
+    if heading >= 0:
+        finish()
+    return headings
+
+
+def rewrite_links(doc, rewrite):
+    #Replaces every link href and image src with rewrite(url)
+    for index in range(len(doc)):
+        kind = doc.kind[index]
+        if kind == LINK:
+            doc.props[index]["href"] = rewrite(doc.props[index]["href"])
+        elif kind == IMAGE:
+            doc.props[index]["src"] = rewrite(doc.props[index]["src"])
+
+
+def lazy_load_images(doc):
+    for index in range(len(doc)):
+        if doc.kind[index] == IMAGE:
+            doc.props[index]["loading"] = "lazy"
+
+
+def run_passes(doc, passes):
+    #Each pass is a callable pass(doc) that updates the document in place
+    for transform in passes:
+        transform(doc)
+    return doc
@@ -0,0 +1,100 @@
+import gzip
+from xml.sax.saxutils import escape
+
+
+def atom_date(date):
+    #Front matter dates are plain YYYY-MM-DD; Atom wants a full timestamp
+    if len(date) == 10:
+        return f"{date}T00:00:00Z"
+    return date
+
+
+def _open_output(path):
+    #Paths ending in .gz are gzip-compressed as they are written
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+class FeedWriter:
+    #Base for the streaming feed writers: the header is written on open and
+    #each add() writes one entry, so nothing is held in memory.
+    def __init__(self, path):
+        self.path = path
+        self._file = _open_output(path)
+        self._file.write(self.header())
+
+    def header(self):
+        raise NotImplementedError("Not Implemented")
+
+    def footer(self):
+        raise NotImplementedError("Not Implemented")
+
+    def close(self):
+        if self._file is not None:
+            self._file.write(self.footer())
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class AtomFeedWriter(FeedWriter):
+    def __init__(self, path, title, site_url, updated):
+        self.title = title
+        self.site_url = site_url.rstrip("/")
+        self.updated = updated
+        super().__init__(path)
+
+    def header(self):
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+            f"<title>{escape(self.title)}</title>\n"
+            f'<link href="{escape(self.site_url)}/"/>\n'
+            f"<id>{escape(self.site_url)}/</id>\n"
+            f"<updated>{escape(self.updated)}</updated>\n"
+        )
+
+    def footer(self):
+        return "</feed>\n"
+
+    def add(self, title, url, updated, summary=None):
+        link = escape(self.site_url + url)
+        entry = f'<entry><title>{escape(title)}</title><link href="{link}"/><id>{link}</id><updated>{escape(updated)}</updated>'
+        if summary:
+            entry += f"<summary>{escape(summary)}</summary>"
+        self._file.write(entry + "</entry>\n")
+
+
+class RssFeedWriter(FeedWriter):
+    def __init__(self, path, title, site_url, description=""):
+        self.title = title
+        self.site_url = site_url.rstrip("/")
+        self.description = description
+        super().__init__(path)
+
+    def header(self):
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<rss version="2.0"><channel>\n'
+            f"<title>{escape(self.title)}</title>\n"
+            f"<link>{escape(self.site_url)}/</link>\n"
+            f"<description>{escape(self.description)}</description>\n"
+        )
+
+    def footer(self):
+        return "</channel></rss>\n"
+
+    def add(self, title, url, pub_date=None, description=None):
+        link = escape(self.site_url + url)
+        item = f"<item><title>{escape(title)}</title><link>{link}</link><guid>{link}</guid>"
+        if pub_date:
+            item += f"<pubDate>{escape(pub_date)}</pubDate>"
+        if description:
+            item += f"<description>{escape(description)}</description>"
+        self._file.write(item + "</item>\n")
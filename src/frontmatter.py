@@ -0,0 +1,124 @@
+import json
+import os
+
+DELIMITER = "---"
+
+
+def parse_front_matter_lines(lines):
+    #Parses simple "key: value" lines. Values in [brackets] become lists.
+    metadata = {}
+    for line in lines:
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise ValueError(f"invalid front matter line: {line}")
+        value = value.strip()
+        if value.startswith("[") and value.endswith("]"):
+            value = [item.strip().strip("\"'") for item in value[1:-1].split(",") if item.strip()]
+        else:
+            value = value.strip("\"'")
+        metadata[key.strip()] = value
+    return metadata
+
+
+def split_front_matter(markdown):
+    #Returns (metadata, body). Markdown without front matter comes back unchanged.
+    #Like read_front_matter, the header only ends at a line that is exactly
+    #the delimiter, so "----" or "--- x" inside it are ordinary lines.
+    if not markdown.startswith(DELIMITER + "\n"):
+        return {}, markdown
+    lines = markdown.split("\n")
+    for i in range(1, len(lines)):
+        if lines[i] == DELIMITER:
+            return parse_front_matter_lines(lines[1:i]), "\n".join(lines[i + 1 :])
+    raise ValueError("front matter is not closed")
+
+
+def read_front_matter(path):
+    #Reads only the header of a markdown file, never the body
+    with open(path, encoding="utf-8") as f:
+        if f.readline().rstrip("\n") != DELIMITER:
+            return {}
+        lines = []
+        for line in f:
+            if line.rstrip("\n") == DELIMITER:
+                return parse_front_matter_lines(lines)
+            lines.append(line)
+    raise ValueError(f"front matter is not closed in {path}")
+
+
+class MetadataIndex:
+    #Persistent index of page front matter, keyed by path relative to the
+    #content directory. update() only re-reads files whose mtime or size changed.
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.pages = json.load(f)["pages"]
+
+    @classmethod
+    def from_pages(cls, metadata_by_path):
+        #An in-memory index over metadata gathered elsewhere, such as shard manifests
+        index = cls(None)
+        index.pages = {rel_path: {"mtime": None, "size": None, "meta": meta} for rel_path, meta in metadata_by_path.items()}
+        return index
+
+    def update(self, content_dir):
+        #Syncs the index with content_dir and returns the paths that changed
+        changed = []
+        seen = set()
+        for root, _, files in os.walk(content_dir):
+            for name in files:
+                if not name.endswith(".md"):
+                    continue
+                full_path = os.path.join(root, name)
+                rel_path = os.path.relpath(full_path, content_dir).replace(os.sep, "/")
+                seen.add(rel_path)
+                stat = os.stat(full_path)
+                entry = self.pages.get(rel_path)
+                if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                    continue
+                self.pages[rel_path] = {
+                    "mtime": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "meta": read_front_matter(full_path),
+                }
+                changed.append(rel_path)
+        for rel_path in list(self.pages):
+            if rel_path not in seen:
+                del self.pages[rel_path]
+                changed.append(rel_path)
+        return changed
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"pages": self.pages}, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def entries(self):
+        #Yields (path, metadata) newest first, for feeds and archive pages
+        items = sorted(self.pages.items(), key=lambda item: (str(item[1]["meta"].get("date", "")), item[0]))
+        for rel_path, entry in reversed(items):
+            yield rel_path, entry["meta"]
+
+    def by_tag(self):
+        tags = {}
+        for rel_path, meta in self.entries():
+            page_tags = meta.get("tags", [])
+            if isinstance(page_tags, str):
+                page_tags = [page_tags]
+            for tag in page_tags:
+                tags.setdefault(tag, []).append(rel_path)
+        return tags
+
+    def by_year(self):
+        years = {}
+        for rel_path, meta in self.entries():
+            date = str(meta.get("date", ""))
+            if date:
+                years.setdefault(date[:4], []).append(rel_path)
+        return years
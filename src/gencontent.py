@@ -0,0 +1,143 @@
+import html
+import os
+
+from docast import parse_document, to_html
+from frontmatter import split_front_matter
+from headings import HeadingCollector, slugify
+from htmlnode import LeafNode, ParentNode
+
+
+def extract_title(markdown):
+    meta, body = split_front_matter(markdown)
+    if meta.get("title"):
+        return meta["title"]
+    for line in body.split("\n"):
+        if line.startswith("# "):
+            return line[2:].strip()
+    raise ValueError("no title found")
+
+
+def page_url(rel_path):
+    #Maps a content path like "blog/index.md" or "blog/post.md" to its url
+    rel_path = rel_path.replace(os.sep, "/")
+    if rel_path == "index.md":
+        return "/"
+    if rel_path.endswith("/index.md"):
+        return "/" + rel_path[: -len("index.md")]
+    return "/" + rel_path[: -len(".md")] + ".html"
+
+
+def page_dest_path(rel_path, dest_dir_path):
+    return os.path.join(dest_dir_path, rel_path[: -len(".md")] + ".html")
+
+
+def render_page(markdown, template, headings=None, includes=None, path=None):
+    #Fills {{ Title }}, {{ Content }} and {{ TOC }}; pass a HeadingCollector
+    #to keep the page's heading ids, and a FragmentRenderer plus the page's
+    #path to expand {% include %} blocks
+    if headings is None:
+        headings = HeadingCollector()
+    meta, _ = split_front_matter(markdown)
+    if includes is not None:
+        content_html = "".join(includes.markdown_to_html_node(path, markdown, headings).iter_html())
+    else:
+        content_html = to_html(parse_document(markdown, headings))
+    return meta, fill_template(template, extract_title(markdown), content_html, headings)
+
+
+def fill_template(template, title, content_html, headings):
+    page = template.replace("{{ Title }}", title).replace("{{ Content }}", content_html)
+    if "{{ TOC }}" in page:
+        page = page.replace("{{ TOC }}", headings.toc_html())
+    return page
+
+
+def generate_page(from_path, template_path, dest_path, headings=None, includes=None):
+    print(f" * {from_path} {template_path} -> {dest_path}")
+    with open(from_path, encoding="utf-8") as f:
+        markdown = f.read()
+    with open(template_path, encoding="utf-8") as f:
+        template = f.read()
+
+    meta, page = render_page(markdown, template, headings, includes, from_path)
+
+    dest_dir_path = os.path.dirname(dest_path)
+    if dest_dir_path != "":
+        os.makedirs(dest_dir_path, exist_ok=True)
+    with open(dest_path, "w", encoding="utf-8") as f:
+        f.write(page)
+    return meta
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, on_page=None, heading_index=None, includes=None):
+    #Builds every markdown file under dir_path_content. on_page(url, meta, dest_path)
+    #is called as each page finishes so sitemaps and feeds can stream entries,
+    #and each page's heading ids are recorded in heading_index if one is given.
+    for root, dirs, files in os.walk(dir_path_content):
+        dirs.sort()
+        for filename in sorted(files):
+            if not filename.endswith(".md"):
+                continue
+            from_path = os.path.join(root, filename)
+            rel_path = os.path.relpath(from_path, dir_path_content)
+            dest_path = page_dest_path(rel_path, dest_dir_path)
+            headings = HeadingCollector()
+            meta = generate_page(from_path, template_path, dest_path, headings, includes)
+            url = page_url(rel_path)
+            if heading_index is not None:
+                heading_index.add(url, headings.ids())
+            if on_page is not None:
+                on_page(url, meta, dest_path)
+
+
+
+def listing_html_node(title, rel_paths, metadata, headings):
+    #Built as nodes rather than markdown so titles are never parsed as markup
+    items = []
+    for rel_path in rel_paths:
+        url = page_url(rel_path)
+        text = html.escape(metadata.pages[rel_path]["meta"].get("title", url), quote=False)
+        items.append(ParentNode("li", [LeafNode("a", text, {"href": html.escape(url)})]))
+    heading = LeafNode("h1", html.escape(title, quote=False), {"id": headings.add(1, title)})
+    return ParentNode("div", [heading, ParentNode("ul", items)])
+
+
+def tag_slugs(tags):
+    #Distinct tags can share a slug ("C++" and "C#" are both "c"), so later
+    #ones in sorted order get a numeric suffix
+    slugs = {}
+    used = set()
+    for tag in sorted(tags):
+        base = slug = slugify(tag)
+        count = 0
+        while slug in used:
+            count += 1
+            slug = f"{base}-{count}"
+        used.add(slug)
+        slugs[tag] = slug
+    return slugs
+
+
+def generate_listings(metadata, template_path, dest_dir_path, on_page=None):
+    #Writes a page per tag (/tags/<slug>/) and per year (/archive/<year>/) from
+    #a MetadataIndex, newest first. on_page is called as for
+    #generate_pages_recursive. Returns the listing url of each tag.
+    with open(template_path, encoding="utf-8") as f:
+        template = f.read()
+    by_tag = metadata.by_tag()
+    slugs = tag_slugs(by_tag)
+    listings = [(f"tags/{slugs[tag]}", f"Tagged {tag}", rel_paths) for tag, rel_paths in by_tag.items()]
+    listings += [(f"archive/{year}", f"Posts from {year}", rel_paths) for year, rel_paths in metadata.by_year().items()]
+    for rel_dir, title, rel_paths in sorted(listings):
+        rel_path = f"{rel_dir}/index.md"
+        dest_path = page_dest_path(rel_path, dest_dir_path)
+        print(f" * {rel_dir} -> {dest_path}")
+        headings = HeadingCollector()
+        node = listing_html_node(title, rel_paths, metadata, headings)
+        page = fill_template(template, html.escape(title, quote=False), "".join(node.iter_html()), headings)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, "w", encoding="utf-8") as f:
+            f.write(page)
+        if on_page is not None:
+            on_page(page_url(rel_path), {}, dest_path)
+    return {tag: page_url(f"tags/{slug}/index.md") for tag, slug in slugs.items()}
@@ -0,0 +1,92 @@
+import json
+import re
+
+from htmlnode import LeafNode, ParentNode
+
+
+def slugify(text):
+    slug = re.sub(r"[^\w\s-]", "", text.lower())
+    return re.sub(r"[\s_-]+", "-", slug).strip("-") or "section"
+
+
+class HeadingCollector:
+    #Hands out unique heading ids for one page while its blocks are rendered
+    #and remembers (level, text, id) for the table of contents
+    def __init__(self):
+        self.entries = []
+        self._used = set()
+        self._counts = {}
+
+    def add(self, level, text):
+        slug = slugify(text)
+        heading_id = slug
+        count = self._counts.get(slug, 0)
+        while heading_id in self._used:
+            count += 1
+            heading_id = f"{slug}-{count}"
+        self._counts[slug] = count
+        self._used.add(heading_id)
+        self.entries.append((level, text, heading_id))
+        return heading_id
+
+    def ids(self):
+        return [heading_id for _, _, heading_id in self.entries]
+
+    def toc_html_node(self):
+        #Nested <ul> of links; deeper levels hang off the previous <li>
+        if not self.entries:
+            return None
+        root = ParentNode("ul", [])
+        stack = [(self.entries[0][0], root)]
+        for level, text, heading_id in self.entries:
+            while len(stack) > 1 and level < stack[-1][0]:
+                stack.pop()
+            if level > stack[-1][0] and stack[-1][1].children:
+                #Reuse a sublist left open by a deeper heading (h1, h3, h2)
+                item = stack[-1][1].children[-1]
+                if item.children[-1].tag == "ul":
+                    sublist = item.children[-1]
+                else:
+                    sublist = ParentNode("ul", [])
+                    item.children.append(sublist)
+                stack.append((level, sublist))
+            link = LeafNode("a", text, {"href": f"#{heading_id}"})
+            stack[-1][1].children.append(ParentNode("li", [link]))
+        return root
+
+    def toc_html(self):
+        node = self.toc_html_node()
+        return node.to_html() if node else ""
+
+
+class HeadingIndex:
+    #Site-wide map of page url -> heading ids, so "/page.html#id" links can be
+    #checked with two dictionary/set lookups
+    def __init__(self, pages=None):
+        self.pages = {url: set(ids) for url, ids in (pages or {}).items()}
+
+    def add(self, url, ids):
+        self.pages[url] = set(ids)
+
+    def has_anchor(self, url, anchor):
+        return anchor in self.pages.get(url, ())
+
+    def broken_anchor_links(self, page_url, links):
+        #Returns the internal links with a #fragment that does not resolve
+        broken = []
+        for link in links:
+            if "#" not in link or "://" in link:
+                continue
+            target, _, anchor = link.partition("#")
+            if not self.has_anchor(target or page_url, anchor):
+                broken.append(link)
+        return broken
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({url: sorted(ids) for url, ids in self.pages.items()}, f, sort_keys=True)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
@@ -0,0 +1,228 @@
+import hashlib
+import html
+import os
+import re
+from collections import OrderedDict
+from threading import Lock, get_ident
+
+
+class RegexLexer:
+    #A lexer is anything callable as lexer(code) -> html string.
+    #RegexLexer is the built-in one: an ordered list of (token class, pattern)
+    #rules compiled into a single alternation so the code is scanned once.
+    def __init__(self, rules):
+        self.rules = rules
+        self.pattern = re.compile(
+            "|".join(f"(?P<t{i}>{pattern})" for i, (_, pattern) in enumerate(rules)),
+            re.MULTILINE,
+        )
+        #Stable across runs, and changes whenever the rules do
+        self.identity = hashlib.sha1(repr(rules).encode()).hexdigest()[:16]
+
+    def __call__(self, code):
+        parts = []
+        pos = 0
+        for match in self.pattern.finditer(code):
+            if match.start() > pos:
+                parts.append(html.escape(code[pos:match.start()], quote=False))
+            token_class = self.rules[int(match.lastgroup[1:])][0]
+            parts.append(
+                f'<span class="tok-{token_class}">{html.escape(match.group(), quote=False)}</span>'
+            )
+            pos = match.end()
+        parts.append(html.escape(code[pos:], quote=False))
+        return "".join(parts)
+
+
+def _keywords(words):
+    return r"\b(?:" + "|".join(words.split()) + r")\b"
+
+
+PYTHON = RegexLexer([
+    ("comment", r"#[^\n]*"),
+    ("string", r'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''),
+    ("keyword", _keywords(
+        "and as assert async await break class continue def del elif else except "
+        "False finally for from global if import in is lambda None nonlocal not or "
+        "pass raise return True try while with yield"
+    )),
+    ("builtin", _keywords("print len range str int float list dict set tuple open self")),
+    ("number", r"\b\d+(?:\.\d+)?\b"),
+])
+
+JAVASCRIPT = RegexLexer([
+    ("comment", r"//[^\n]*|/\*[\s\S]*?\*/"),
+    ("string", r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`'),
+    ("keyword", _keywords(
+        "async await break case catch class const continue default delete do else "
+        "export extends false finally for function if import in instanceof let new "
+        "null return super switch this throw true try typeof undefined var void while yield"
+    )),
+    ("number", r"\b\d+(?:\.\d+)?\b"),
+])
+
+BASH = RegexLexer([
+    ("comment", r"(?<![\w$])#[^\n]*"),
+    ("string", r'"(?:\\.|[^"\\])*"|\'[^\']*\''),
+    ("variable", r"\$\{[^}\n]*\}|\$\w+"),
+    ("keyword", _keywords("case do done elif else esac export fi for function if in local return then while")),
+])
+
+JSON = RegexLexer([
+    ("key", r'"(?:\\.|[^"\\\n])*"(?=\s*:)'),
+    ("string", r'"(?:\\.|[^"\\\n])*"'),
+    ("keyword", _keywords("true false null")),
+    ("number", r"-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b"),
+])
+
+LEXERS = {}
+LEXER_IDS = {}
+
+
+def lexer_identity(lexer, version=None):
+    #Identifies a lexer in cache keys so re-registering a different lexer for a
+    #language never serves html cached from the old one. Plain functions are
+    #identified by their name and compiled code; anything else can set an
+    #identity attribute or be registered with a version.
+    parts = [
+        getattr(lexer, "identity", ""),
+        getattr(lexer, "__module__", ""),
+        getattr(lexer, "__qualname__", type(lexer).__qualname__),
+        str(version if version is not None else getattr(lexer, "version", "")),
+    ]
+    code = getattr(lexer, "__code__", None)
+    if code is not None:
+        parts.append(code.co_code.hex() + repr(code.co_consts))
+    return hashlib.sha1("\0".join(parts).encode()).hexdigest()[:16]
+
+
+def register_lexer(language, lexer, aliases=(), version=None):
+    #Plugs a lexer into the highlighting stage for a fence language
+    identity = lexer_identity(lexer, version)
+    for name in (language, *aliases):
+        LEXERS[name.lower()] = lexer
+        LEXER_IDS[name.lower()] = identity
+
+
+register_lexer("python", PYTHON, ("py",))
+register_lexer("javascript", JAVASCRIPT, ("js",))
+register_lexer("bash", BASH, ("sh", "shell"))
+register_lexer("json", JSON)
+
+
+class HighlightCache:
+    #Bounded on-disk cache of highlighted html keyed by (language, lexer, code
+    #hash). Entries are evicted least-recently-used once max_entries is
+    #exceeded. Several processes may share one directory: a miss in this
+    #process's view still checks the disk, and before evicting, the directory
+    #is re-scanned so the bound holds for all of them together.
+    def __init__(self, directory, max_entries=1000):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        self._entries = self._scan()
+        self._lock = Lock()
+
+    def _scan(self):
+        #Entries on disk, least recently used first. Another process may evict
+        #files between listing and stat, so vanished ones are skipped.
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".html"):
+                try:
+                    mtime = os.stat(os.path.join(self.directory, name)).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                entries.append((mtime, name[:-5]))
+        entries.sort()
+        return OrderedDict((key, None) for _, key in entries)
+
+    @staticmethod
+    def key(language, code, lexer_id=""):
+        return hashlib.sha256(f"{language}\0{lexer_id}\0{code}".encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.html")
+
+    def get(self, language, code, lexer_id=""):
+        key = self.key(language, code, lexer_id)
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                value = f.read()
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        with self._lock:
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, language, code, value, lexer_id=""):
+        key = self.key(language, code, lexer_id)
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(value)
+        os.replace(tmp_path, self._path(key))
+        with self._lock:
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+            evicted = []
+            if len(self._entries) > self.max_entries:
+                #Other processes' puts may be missing from this view, so evict
+                #from the directory's view, down to a tenth below the bound so
+                #the next re-scan is not due on the very next put. Entries this
+                #process used keep their exact order, after the others'.
+                on_disk = self._scan()
+                for known in self._entries:
+                    if known in on_disk:
+                        on_disk.move_to_end(known)
+                self._entries = on_disk
+                while len(self._entries) > self.max_entries - self.max_entries // 10:
+                    evicted.append(self._entries.popitem(last=False)[0])
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = None
+
+
+def set_cache(cache):
+    #Sets the HighlightCache used by highlight(), or None to disable caching
+    global _cache
+    _cache = cache
+
+
+def use_cache_dir(directory, max_entries=1000):
+    #Installs a HighlightCache on directory unless one is already in use there.
+    #Build entry points call this, including inside each worker process.
+    if directory is None:
+        return
+    if _cache is None or os.path.abspath(_cache.directory) != os.path.abspath(directory):
+        set_cache(HighlightCache(directory, max_entries))
+
+
+def highlight(code, language):
+    #Returns highlighted html for code, or None if no lexer handles language
+    if not language:
+        return None
+    language = language.lower()
+    lexer = LEXERS.get(language)
+    if lexer is None:
+        return None
+    lexer_id = LEXER_IDS.get(language, "")
+    if _cache is not None:
+        cached = _cache.get(language, code, lexer_id)
+        if cached is not None:
+            return cached
+    value = lexer(code)
+    if _cache is not None:
+        _cache.put(language, code, value, lexer_id)
+    return value
@@ -7,6 +7,11 @@ class HTMLNode():
 
     def to_html(self):
         raise NotImplementedError("Not Implemented")
+
+    def iter_html(self):
+        #Yields the html in pieces so large pages can be written without
+        #building one string per level of nesting
+        yield self.to_html()
     
     def props_to_html(self):
         if self.props is None:
@@ -24,7 +29,7 @@ class LeafNode(HTMLNode):
         super().__init__(tag, value, None, props)
 
     def to_html(self):
-        if not self.value:
+        if self.value is None:
             raise ValueError("Leaf nodes must have a value")
         if not self.tag:
             return self.value
@@ -47,7 +52,38 @@ class ParentNode(HTMLNode):
         for child in self.children:
             children_html += child.to_html()
         
-        return f"<{self.tag}>{children_html}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+
+    def iter_html(self):
+        if not self.tag:
+            raise ValueError("ParentNode must have a tag")
+        if not self.children:
+            raise ValueError("ParentNode must have children")
+        yield f"<{self.tag}{self.props_to_html()}>"
+        for child in self.children:
+            yield from child.iter_html()
+        yield f"</{self.tag}>"
     
     def __repr__(self):
-        return f"ParentNode({self.tag}, {self.children}, {self.props})"
\ No newline at end of file
+        return f"ParentNode({self.tag}, {self.children}, {self.props})"
+
+class StreamingParentNode(HTMLNode):
+    #A parent whose children are produced on demand by children_factory(), so
+    #huge lists (e.g. table rows) are built and serialized one child at a time
+    def __init__(self, tag, children_factory, props=None):
+        super().__init__(tag, None, None, props)
+        self.children_factory = children_factory
+
+    def to_html(self):
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        if not self.tag:
+            raise ValueError("StreamingParentNode must have a tag")
+        yield f"<{self.tag}{self.props_to_html()}>"
+        for child in self.children_factory():
+            yield from child.iter_html()
+        yield f"</{self.tag}>"
+
+    def __repr__(self):
+        return f"StreamingParentNode({self.tag}, {self.children_factory}, {self.props})"
\ No newline at end of file
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+
+from frontmatter import split_front_matter
+from headings import HeadingCollector
+from htmlnode import LeafNode, ParentNode
+from markdown_blocks import BlockType, block_to_block_type, block_to_html_node, markdown_to_blocks
+
+#A block of its own: {% include "snippets/install.md" %}
+INCLUDE_RE = re.compile(r'^\{%\s*include\s+"([^"]+)"\s*%\}$')
+
+
+def include_targets(blocks):
+    #Targets of the include blocks among blocks, in order. Only whole blocks
+    #count, so an include line shown inside a code block is left alone.
+    targets = []
+    for block in blocks:
+        match = INCLUDE_RE.match(block)
+        if match:
+            targets.append(match.group(1))
+    return targets
+
+
+class IncludeGraph:
+    #Direct include edges, path -> paths it includes, plus the reverse lookup
+    #needed to find every page affected by an edited snippet
+    def __init__(self, edges=None):
+        self.edges = {path: set(included) for path, included in (edges or {}).items()}
+
+    def record(self, path, included):
+        self.edges[path] = set(included)
+
+    def includes(self, path):
+        #Every file path pulls in, directly or through other fragments
+        seen = set()
+        stack = list(self.edges.get(path, ()))
+        while stack:
+            included = stack.pop()
+            if included not in seen:
+                seen.add(included)
+                stack.extend(self.edges.get(included, ()))
+        return seen
+
+    def dependents(self, changed_paths):
+        #Every file that includes any of changed_paths, directly or not
+        reverse = {}
+        for path, included in self.edges.items():
+            for target in included:
+                reverse.setdefault(target, set()).add(path)
+        seen = set()
+        stack = list(changed_paths)
+        while stack:
+            for path in reverse.get(stack.pop(), ()):
+                if path not in seen:
+                    seen.add(path)
+                    stack.append(path)
+        return seen
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({source: sorted(included) for source, included in self.edges.items()}, f, sort_keys=True)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+
+class FragmentRenderer:
+    #Renders pages whose blocks may include other markdown files. Each fragment
+    #is rendered once and memoized, by a hash of its content and of everything
+    #it includes, as a list of parts: rendered html, or a heading block left
+    #for the including page's HeadingCollector so ids stay unique per page.
+    #At most max_fragments are kept, least recently used first out.
+    def __init__(self, root_dir, max_fragments=1024):
+        self.root_dir = root_dir
+        self.graph = IncludeGraph()
+        self.max_fragments = max_fragments
+        self.fragments = OrderedDict()
+        self.sources = {}
+        self.renders = 0
+        self.reuses = 0
+
+    def resolve(self, from_path, target):
+        #"/snippets/x.md" is relative to root_dir (the project root, so shared
+        #snippets can live outside the content directory and not become pages);
+        #anything else is relative to the including file
+        if target.startswith("/"):
+            return os.path.normpath(os.path.join(self.root_dir, target.lstrip("/")))
+        return os.path.normpath(os.path.join(os.path.dirname(from_path), target))
+
+    def _source(self, path):
+        #(markdown, blocks, included paths, content hash) of a file, read and
+        #split again only when its mtime or size changes
+        stat = os.stat(path)
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        cached = self.sources.get(path)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+        with open(path, encoding="utf-8") as f:
+            markdown = f.read()
+        _, body = split_front_matter(markdown)
+        blocks = markdown_to_blocks(body)
+        included = [self.resolve(path, target) for target in include_targets(blocks)]
+        source = (markdown, blocks, included, hashlib.sha256(markdown.encode("utf-8")).hexdigest())
+        self.sources[path] = (stat_key, source)
+        return source
+
+    def _fragment_key(self, path, stack):
+        if path in stack:
+            raise ValueError("include cycle: " + " -> ".join(stack + [path]))
+        source = self._source(path)
+        _, _, included, content_hash = source
+        self.graph.record(path, included)
+        digest = hashlib.sha256(content_hash.encode())
+        for included_path in included:
+            digest.update(self._fragment_key(included_path, stack + [path])[0].encode())
+        return digest.hexdigest(), source
+
+    def content_key(self, path):
+        #Hash of a file's content and everything it includes, and its content
+        key, source = self._fragment_key(os.path.normpath(path), [])
+        return key, source[0]
+
+    def fragment_parts(self, path, stack=()):
+        #(is_heading, text) pairs: a heading block to render with the page's
+        #collector, or html that is the same wherever the fragment appears
+        key, source = self._fragment_key(path, list(stack))
+        parts = self.fragments.get(key)
+        if parts is not None:
+            self.fragments.move_to_end(key)
+            self.reuses += 1
+            return parts
+        self.renders += 1
+        parts = []
+        for block in source[1]:
+            match = INCLUDE_RE.match(block)
+            if match:
+                parts.extend(self.fragment_parts(self.resolve(path, match.group(1)), list(stack) + [path]))
+            elif block_to_block_type(block) == BlockType.HEADING:
+                parts.append((True, block))
+            else:
+                parts.append((False, "".join(block_to_html_node(block).iter_html())))
+        self.fragments[key] = parts
+        while len(self.fragments) > self.max_fragments:
+            self.fragments.popitem(last=False)
+        return parts
+
+    def _render_blocks(self, path, blocks, headings, stack):
+        children = []
+        for block in blocks:
+            match = INCLUDE_RE.match(block)
+            if not match:
+                children.append(block_to_html_node(block, headings))
+                continue
+            for is_heading, text in self.fragment_parts(self.resolve(path, match.group(1)), stack):
+                if is_heading:
+                    children.append(block_to_html_node(text, headings))
+                else:
+                    children.append(LeafNode(None, text))
+        return children
+
+    def markdown_to_html_node(self, path, markdown, headings=None):
+        #Drop-in for markdown_blocks.markdown_to_html_node that expands includes
+        if headings is None:
+            headings = HeadingCollector()
+        _, body = split_front_matter(markdown)
+        blocks = markdown_to_blocks(body)
+        path = os.path.normpath(path)
+        self.graph.record(path, [self.resolve(path, target) for target in include_targets(blocks)])
+        return ParentNode("div", self._render_blocks(path, blocks, headings, [path]))
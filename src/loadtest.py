@@ -0,0 +1,74 @@
+import argparse
+import http.client
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run_client(url, requests, conditional):
+    #Sends requests over one keep-alive connection, returning (latencies, statuses)
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+    path = parts.path or "/"
+    latencies = []
+    statuses = {}
+    etag = None
+    for _ in range(requests):
+        headers = {}
+        if conditional and etag:
+            headers["If-None-Match"] = etag
+        start = time.perf_counter()
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+        etag = response.getheader("ETag") or etag
+    connection.close()
+    return latencies, statuses
+
+
+def load_test(url, clients=8, requests=200, conditional=False):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        results = list(pool.map(lambda _: run_client(url, requests, conditional), range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+    statuses = {}
+    for _, client_statuses in results:
+        for status, count in client_statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the dev server")
+    parser.add_argument("url", nargs="?", default="http://localhost:8888/")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--conditional", action="store_true", help="send If-None-Match after the first response")
+    args = parser.parse_args()
+
+    stats = load_test(args.url, args.clients, args.requests, args.conditional)
+    print(f"{stats['requests']} requests in {stats['seconds']:.2f}s ({stats['requests_per_second']:.0f} req/s)")
+    print(f"p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms")
+    print(f"statuses: {stats['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,92 @@
-from textnode import *
+import argparse
+import os
+import shutil
+
+from copystatic import copy_files_recursive
+from sharding import build_shard, merge_shards, parse_shard, shard_manifest_paths
+from versions import build_versions
+
+dir_path_static = "./static"
+dir_path_public = "./public"
+dir_path_content = "./content"
+dir_path_shards = "./shards"
+dir_path_highlight_cache = "./.cache/highlight"
+dir_path_build_manifest = "./.cache/build"
+template_path = "./template.html"
+site_url = "http://localhost:8888"
+site_title = "Static Site"
+
+
+def shard_arg(value):
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def shard_count_arg(value):
+    if not value.isdigit() or int(value) < 1:
+        raise argparse.ArgumentTypeError(f"invalid shard count {value!r}, expected N >= 1")
+    return int(value)
+
+
+def clean():
+    #Forgets the previous build, so the next one renders every page
+    for directory in (dir_path_public, dir_path_build_manifest):
+        if os.path.exists(directory):
+            print(f"Deleting {directory}...")
+            shutil.rmtree(directory)
+
+
+def build():
+    print("Copying static files to public directory...")
+    copy_files_recursive(dir_path_static, dir_path_public)
+
+    #A single-shard build followed by the same merge as a sharded build, so
+    #both produce the same site. The shard keeps its state in
+    #dir_path_build_manifest, so only pages affected by an edit are rendered.
+    print("Generating content...")
+    path = build_shard(
+        dir_path_content, template_path, dir_path_public, 0, 1, dir_path_build_manifest, dir_path_highlight_cache
+    )
+    print("Generating indexes, listings and feed...")
+    merge_shards([path], dir_path_public, site_url, site_title, template_path)
+
 
 def main():
-    node = TextNode("This is some anchor text", TextType.LINK, "https://www.boot.dev")
-    print(node)
+    parser = argparse.ArgumentParser(description="Build the static site")
+    parser.add_argument("--shard", type=shard_arg, help="build only shard i of N (1-based, e.g. 2/8) and write its manifest")
+    parser.add_argument("--merge", type=shard_count_arg, metavar="N", help="merge the manifests of shards 1..N into the public directory")
+    parser.add_argument("--versions", help="build each version directory under this path, rendering shared pages once")
+    parser.add_argument("--clean", action="store_true", help="delete the public directory and build state first")
+    args = parser.parse_args()
+
+    if args.clean:
+        clean()
+
+    if args.shard:
+        shard, shard_count = args.shard
+        print(f"Building shard {shard + 1} of {shard_count}...")
+        path = build_shard(
+            dir_path_content, template_path, dir_path_public, shard, shard_count, dir_path_shards, dir_path_highlight_cache
+        )
+        print(f" * manifest -> {path}")
+    elif args.merge is not None:
+        print("Copying static files to public directory...")
+        copy_files_recursive(dir_path_static, dir_path_public)
+        print("Merging shards...")
+        pages = merge_shards(
+            shard_manifest_paths(dir_path_shards, args.merge), dir_path_public, site_url, site_title, template_path
+        )
+        print(f" * {len(pages)} pages")
+    elif args.versions:
+        print("Copying static files to public directory...")
+        copy_files_recursive(dir_path_static, dir_path_public)
+        print("Generating versioned content...")
+        report = build_versions(args.versions, template_path, dir_path_public, highlight_cache_dir=dir_path_highlight_cache)
+        print(f" * {report}")
+    else:
+        build()
+
 
-main()
\ No newline at end of file
+main()
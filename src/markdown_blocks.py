@@ -1,9 +1,6 @@
+import re
 from enum import Enum
 
-from htmlnode import ParentNode
-from inline_markdown import text_to_textnodes
-from textnode import text_node_to_html_node, TextNode, TextType
-
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -12,6 +9,11 @@ class BlockType(Enum):
     QUOTE = "quote"
     OLIST = "ordered_list"
     ULIST = "unordered_list"
+    TABLE = "table"
+
+
+TABLE_DELIMITER_RE = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+INLINE_MARKUP_CHARS = ("*", "_", "`", "[")
 
 
 def markdown_to_blocks(markdown):
@@ -32,6 +34,11 @@ def block_to_block_type(block):
         return BlockType.HEADING
     if len(lines) > 1 and lines[0].startswith("```") and lines[-1].startswith("```"):
         return BlockType.CODE
+    if len(lines) > 1 and "|" in lines[0] and "|" in lines[1] and TABLE_DELIMITER_RE.match(lines[1]):
+        #Prose that happens to contain pipes stays a paragraph unless the
+        #delimiter row has one cell per header cell
+        if len(table_row_spans(lines[0])) == len(table_row_spans(lines[1])):
+            return BlockType.TABLE
     if block.startswith(">"):
         for line in lines:
             if not line.startswith(">"):
@@ -52,99 +59,64 @@ def block_to_block_type(block):
     return BlockType.PARAGRAPH
 
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = []
-    for block in blocks:
-        html_node = block_to_html_node(block)
-        children.append(html_node)
-    return ParentNode("div", children, None)
-
-
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
-    if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
-    if block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
-    if block_type == BlockType.CODE:
-        return code_to_html_node(block)
-    if block_type == BlockType.OLIST:
-        return olist_to_html_node(block)
-    if block_type == BlockType.ULIST:
-        return ulist_to_html_node(block)
-    if block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
-    raise ValueError("invalid block type")
-
-
-def text_to_children(text):
-    text_nodes = text_to_textnodes(text)
-    children = []
-    for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
-        children.append(html_node)
-    return children
-
-
-def paragraph_to_html_node(block):
-    lines = block.split("\n")
-    paragraph = " ".join(lines)
-    children = text_to_children(paragraph)
-    return ParentNode("p", children)
-
-
-def heading_to_html_node(block):
-    level = 0
-    for char in block:
-        if char == "#":
-            level += 1
+def markdown_to_html_node(markdown, headings=None):
+    #The HTMLNode view of docast's document; pass a HeadingCollector to get
+    #the page's heading ids and TOC back. docast builds on the block grammar
+    #in this module, so it is imported where it is used.
+    from docast import parse_document, to_html_node
+    return to_html_node(parse_document(markdown, headings))
+
+
+def block_to_html_node(block, headings=None):
+    from docast import parse_block, to_html_node
+    return to_html_node(parse_block(block, headings)).children[0]
+
+
+def table_row_spans(line):
+    #Returns the (start, end) offsets of each cell's stripped text in one pass.
+    #Leading and trailing pipes are optional and \| is an escaped pipe.
+    start = len(line) - len(line.lstrip())
+    end = len(line.rstrip())
+    if start < end and line[start] == "|":
+        start += 1
+    if end > start and line[end - 1] == "|" and line[end - 2 : end] != "\\|":
+        end -= 1
+    spans = []
+    if "\\" not in line:
+        for cell in line[start:end].split("|"):
+            cell_start = start + len(cell) - len(cell.lstrip())
+            spans.append((cell_start, max(cell_start, start + len(cell.rstrip()))))
+            start += len(cell) + 1
+        return spans
+    cell_start = start
+    i = start
+    while i < end:
+        if line[i] == "\\":
+            i += 2
+            continue
+        if line[i] == "|":
+            spans.append((cell_start, i))
+            cell_start = i + 1
+        i += 1
+    spans.append((cell_start, end))
+    stripped = []
+    for cell_start, cell_end in spans:
+        cell = line[cell_start:cell_end]
+        new_start = cell_start + len(cell) - len(cell.lstrip())
+        stripped.append((new_start, max(new_start, cell_start + len(cell.rstrip()))))
+    return stripped
+
+
+def table_alignments(delimiter_line):
+    alignments = []
+    for start, end in table_row_spans(delimiter_line):
+        cell = delimiter_line[start:end]
+        if cell.startswith(":") and cell.endswith(":"):
+            alignments.append("center")
+        elif cell.endswith(":"):
+            alignments.append("right")
+        elif cell.startswith(":"):
+            alignments.append("left")
         else:
-            break
-    if level + 1 >= len(block):
-        raise ValueError(f"invalid heading level: {level}")
-    text = block[level + 1 :]
-    children = text_to_children(text)
-    return ParentNode(f"h{level}", children)
-
-
-def code_to_html_node(block):
-    if not block.startswith("```") or not block.endswith("```"):
-        raise ValueError("invalid code block")
-    text = block[4:-3]
-    raw_text_node = TextNode(text, TextType.TEXT)
-    child = text_node_to_html_node(raw_text_node)
-    code = ParentNode("code", [child])
-    return ParentNode("pre", [code])
-
-
-def olist_to_html_node(block):
-    items = block.split("\n")
-    html_items = []
-    for item in items:
-        text = item[3:]
-        children = text_to_children(text)
-        html_items.append(ParentNode("li", children))
-    return ParentNode("ol", html_items)
-
-
-def ulist_to_html_node(block):
-    items = block.split("\n")
-    html_items = []
-    for item in items:
-        text = item[2:]
-        children = text_to_children(text)
-        html_items.append(ParentNode("li", children))
-    return ParentNode("ul", html_items)
-
-
-def quote_to_html_node(block):
-    lines = block.split("\n")
-    new_lines = []
-    for line in lines:
-        if not line.startswith(">"):
-            raise ValueError("invalid quote block")
-        new_lines.append(line.lstrip(">").strip())
-    content = " ".join(new_lines)
-    children = text_to_children(content)
-    return ParentNode("blockquote", children)
+            alignments.append(None)
+    return alignments
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from multiprocessing import Pool
+
+from feeds import AtomFeedWriter, atom_date
+from frontmatter import MetadataIndex
+from gencontent import extract_title, generate_listings, page_dest_path, page_url, render_page
+from headings import HeadingCollector, HeadingIndex
+from highlight import use_cache_dir
+from includes import FragmentRenderer, IncludeGraph
+from inline_markdown import extract_markdown_links
+from sitemap import SitemapWriter
+
+
+def shard_for(rel_path, shard_count):
+    #Stable across machines and Python runs (unlike hash()), so every node
+    #agrees on the owner of a file without talking to the others
+    rel_path = rel_path.replace(os.sep, "/")
+    digest = hashlib.sha1(rel_path.encode("utf-8")).hexdigest()
+    return int(digest[:16], 16) % shard_count
+
+
+def list_content(dir_path_content):
+    rel_paths = []
+    for root, _, files in os.walk(dir_path_content):
+        for filename in files:
+            if filename.endswith(".md"):
+                rel_path = os.path.relpath(os.path.join(root, filename), dir_path_content)
+                rel_paths.append(rel_path.replace(os.sep, "/"))
+    return sorted(rel_paths)
+
+
+def partition(rel_paths, shard_count):
+    shards = [[] for _ in range(shard_count)]
+    for rel_path in rel_paths:
+        shards[shard_for(rel_path, shard_count)].append(rel_path)
+    return shards
+
+
+def parse_shard(value):
+    #Parses the command line form "i/N" (1-based) into a 0-based (index, count)
+    index, sep, count = value.partition("/")
+    if not sep or not index.isdigit() or not count.isdigit():
+        raise ValueError(f"invalid shard {value!r}, expected i/N")
+    index, count = int(index), int(count)
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"invalid shard {value!r}, expected 1 <= i <= N")
+    return index - 1, count
+
+
+def manifest_path(artifacts_dir, shard, shard_count):
+    return os.path.join(artifacts_dir, f"shard-{shard + 1}-of-{shard_count}.json")
+
+
+def shard_manifest_paths(artifacts_dir, shard_count):
+    #The manifests of one N-shard build. Leftovers from builds with a different
+    #N share the directory but are never picked up.
+    if shard_count < 1:
+        raise ValueError(f"invalid shard count {shard_count}")
+    paths = [manifest_path(artifacts_dir, shard, shard_count) for shard in range(shard_count)]
+    missing = [shard + 1 for shard, path in enumerate(paths) if not os.path.exists(path)]
+    if missing:
+        raise ValueError(f"missing manifests for shards {missing} of {shard_count}")
+    return paths
+
+
+def _stat_key(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _load_manifest(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_shard(dir_path_content, template_path, dest_dir_path, shard, shard_count, artifacts_dir, highlight_cache_dir=None):
+    #Builds the pages owned by one shard and writes its manifest of outputs,
+    #outbound links and search entries for the merge step. Runs in the shard's
+    #own process, so the highlight cache is installed here.
+    #
+    #Builds are incremental: next to the manifest, artifacts_dir keeps the
+    #shard's front matter index and include graph. A page is rendered again
+    #only if it changed, something it includes (directly or not) changed, the
+    #template changed or its output is missing; the rest keep their records.
+    use_cache_dir(highlight_cache_dir)
+    with open(template_path, encoding="utf-8") as f:
+        template = f.read()
+    includes = FragmentRenderer(os.path.dirname(os.path.abspath(dir_path_content)))
+    os.makedirs(artifacts_dir, exist_ok=True)
+    path = manifest_path(artifacts_dir, shard, shard_count)
+    suffix = f"{shard + 1}-of-{shard_count}"
+    graph_path = os.path.join(artifacts_dir, f"includes-{suffix}.json")
+    metadata = MetadataIndex(os.path.join(artifacts_dir, f"metadata-{suffix}.json"))
+    changed_pages = metadata.update(dir_path_content)
+
+    previous = _load_manifest(path)
+    stale = None  #None rebuilds every page
+    if previous is not None and previous.get("template") == _stat_key(template_path) and os.path.exists(graph_path):
+        includes.graph = IncludeGraph.load(graph_path)
+        changed = {os.path.normpath(os.path.join(dir_path_content, rel_path)) for rel_path in changed_pages}
+        changed.update(
+            included for included, stat_key in previous["included"].items() if _stat_key(included) != stat_key
+        )
+        stale = changed | includes.graph.dependents(changed)
+    records = {page["source"]: page for page in previous["pages"]} if previous is not None else {}
+
+    pages = []
+    rendered = 0
+    for rel_path in list_content(dir_path_content):
+        if shard_for(rel_path, shard_count) != shard:
+            continue
+        from_path = os.path.normpath(os.path.join(dir_path_content, rel_path))
+        dest_path = page_dest_path(rel_path, dest_dir_path)
+        record = records.pop(rel_path, None)
+        if stale is not None and record is not None and from_path not in stale and os.path.exists(dest_path):
+            pages.append(record)
+            continue
+        with open(from_path, encoding="utf-8") as f:
+            markdown = f.read()
+        headings = HeadingCollector()
+        meta, page = render_page(markdown, template, headings, includes, from_path)
+        rendered += 1
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, "w", encoding="utf-8") as f:
+            f.write(page)
+        pages.append({
+            "source": rel_path,
+            "output": os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/"),
+            "url": page_url(rel_path),
+            "title": extract_title(markdown),
+            "date": meta.get("date"),
+            "tags": meta.get("tags", []),
+            "links": [url for _, url in extract_markdown_links(markdown)],
+            "headings": headings.ids(),
+        })
+    #Whatever is left in records was deleted since the last build
+    for rel_path, record in records.items():
+        includes.graph.edges.pop(os.path.normpath(os.path.join(dir_path_content, rel_path)), None)
+        output = os.path.join(dest_dir_path, record["output"])
+        if os.path.exists(output):
+            os.remove(output)
+    print(f" * {rendered} pages rendered, {len(pages) - rendered} unchanged")
+    print(f" * {includes.renders} fragments rendered, {includes.reuses} reused")
+
+    includes.graph.save(graph_path)
+    metadata.save()
+    included = set().union(*includes.graph.edges.values())
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "shard": shard,
+            "shard_count": shard_count,
+            "template": _stat_key(template_path),
+            "included": {included_path: _stat_key(included_path) for included_path in sorted(included)},
+            "pages": pages,
+        }, f)
+    return path
+
+
+def merge_shards(manifest_paths, dest_dir_path, site_url, site_title="Static Site", template_path=None):
+    #Combines shard manifests into links.json, search-index.json, headings.json,
+    #the sitemap, feed.xml and, given the template, the tag and archive
+    #listings. Raises ValueError on missing shards or output collisions.
+    manifests = []
+    for path in manifest_paths:
+        with open(path, encoding="utf-8") as f:
+            manifests.append(json.load(f))
+    if not manifests:
+        raise ValueError("no shard manifests to merge")
+    shard_count = manifests[0]["shard_count"]
+    shards = sorted(manifest["shard"] for manifest in manifests)
+    if any(manifest["shard_count"] != shard_count for manifest in manifests):
+        raise ValueError("shard manifests disagree on the shard count")
+    if shards != list(range(shard_count)):
+        raise ValueError(f"expected shards 1..{shard_count}, got {[shard + 1 for shard in shards]}")
+
+    owners = {}
+    collisions = []
+    pages = []
+    for manifest in manifests:
+        for page in manifest["pages"]:
+            if page["output"] in owners:
+                collisions.append(f"{page['output']} (shards {owners[page['output']] + 1} and {manifest['shard'] + 1})")
+            owners[page["output"]] = manifest["shard"]
+            pages.append(page)
+    if collisions:
+        raise ValueError("output collisions: " + ", ".join(collisions))
+
+    pages.sort(key=lambda page: page["url"])
+    os.makedirs(dest_dir_path, exist_ok=True)
+    with open(os.path.join(dest_dir_path, "links.json"), "w", encoding="utf-8") as f:
+        json.dump({page["url"]: page["links"] for page in pages}, f, sort_keys=True)
+    with open(os.path.join(dest_dir_path, "search-index.json"), "w", encoding="utf-8") as f:
+        json.dump([{"url": page["url"], "title": page["title"], "tags": page["tags"]} for page in pages], f)
+    HeadingIndex({page["url"]: page["headings"] for page in pages}).save(
+        os.path.join(dest_dir_path, "headings.json")
+    )
+    metadata = MetadataIndex.from_pages({
+        page["source"]: {key: page[key] for key in ("title", "date", "tags") if page[key]} for page in pages
+    })
+    with SitemapWriter(dest_dir_path, site_url) as sitemap:
+        for page in pages:
+            sitemap.add(page["url"], page["date"])
+        if template_path is not None:
+            generate_listings(metadata, template_path, dest_dir_path, lambda url, meta, dest_path: sitemap.add(url))
+    updated = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    with AtomFeedWriter(os.path.join(dest_dir_path, "feed.xml"), site_title, site_url, updated) as feed:
+        for rel_path, meta in metadata.entries():
+            if meta.get("date"):
+                feed.add(meta["title"], page_url(rel_path), atom_date(meta["date"]))
+    return pages
+
+
+def build_sharded_local(
+    dir_path_content, template_path, dest_dir_path, shard_count, artifacts_dir, site_url,
+    processes=None, highlight_cache_dir=None,
+):
+    #Local stand-in for a multi-node build: one process per shard, then merge
+    args = [
+        (dir_path_content, template_path, dest_dir_path, shard, shard_count, artifacts_dir, highlight_cache_dir)
+        for shard in range(shard_count)
+    ]
+    with Pool(processes or shard_count) as pool:
+        manifest_paths = pool.starmap(build_shard, args)
+    return merge_shards(manifest_paths, dest_dir_path, site_url, template_path=template_path)
@@ -0,0 +1,71 @@
+import gzip
+import os
+from xml.sax.saxutils import escape
+
+MAX_URLS = 50000
+MAX_BYTES = 50 * 1024 * 1024
+
+URLSET_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_FOOTER = "</urlset>\n"
+
+
+class SitemapWriter:
+    #Streams <url> entries straight into gzip sitemap shards, starting a new
+    #shard whenever the next entry would pass max_urls or max_bytes (the
+    #uncompressed size limit). close() writes sitemap.xml as a sitemap index.
+    def __init__(self, dest_dir_path, base_url, max_urls=MAX_URLS, max_bytes=MAX_BYTES):
+        self.dest_dir_path = dest_dir_path
+        self.base_url = base_url.rstrip("/")
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.shards = []
+        self._file = None
+        self._count = 0
+        self._bytes = 0
+        os.makedirs(dest_dir_path, exist_ok=True)
+
+    def _open_shard(self):
+        name = f"sitemap-{len(self.shards) + 1}.xml.gz"
+        self.shards.append(name)
+        self._file = gzip.open(os.path.join(self.dest_dir_path, name), "wb")
+        self._file.write(URLSET_HEADER.encode())
+        self._count = 0
+        self._bytes = len(URLSET_HEADER)
+
+    def _close_shard(self):
+        self._file.write(URLSET_FOOTER.encode())
+        self._file.close()
+        self._file = None
+
+    def add(self, url, lastmod=None):
+        entry = f"<url><loc>{escape(self.base_url + url)}</loc>"
+        if lastmod:
+            entry += f"<lastmod>{escape(str(lastmod))}</lastmod>"
+        entry = (entry + "</url>\n").encode()
+        if self._file is not None and (
+            self._count >= self.max_urls
+            or self._bytes + len(entry) + len(URLSET_FOOTER) > self.max_bytes
+        ):
+            self._close_shard()
+        if self._file is None:
+            self._open_shard()
+        self._file.write(entry)
+        self._count += 1
+        self._bytes += len(entry)
+
+    def close(self):
+        if self._file is not None:
+            self._close_shard()
+        with open(os.path.join(self.dest_dir_path, "sitemap.xml"), "w", encoding="utf-8") as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+            for name in self.shards:
+                f.write(f"<sitemap><loc>{escape(self.base_url + '/' + name)}</loc></sitemap>\n")
+            f.write("</sitemapindex>\n")
+        return self.shards
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
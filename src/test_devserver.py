@@ -0,0 +1,140 @@
+import http.client
+import os
+import tempfile
+import threading
+import unittest
+
+from devserver import DevServer, PageCache
+from loadtest import load_test
+
+
+class TestPageCache(unittest.TestCase):
+    def test_lru_and_mtime_invalidation(self):
+        cache = PageCache(max_entries=2)
+        cache.put("a", (1, 1), b"A", '"a"')
+        cache.put("b", (1, 1), b"B", '"b"')
+        self.assertEqual(cache.get("a", (1, 1)), (b"A", '"a"'))
+        cache.put("c", (1, 1), b"C", '"c"')
+        self.assertIsNone(cache.get("b", (1, 1)))
+        self.assertIsNone(cache.get("a", (2, 1)))
+
+
+class TestDevServer(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        root = self.directory.name
+        self.content = os.path.join(root, "content")
+        static = os.path.join(root, "static")
+        os.makedirs(self.content)
+        os.makedirs(static)
+        with open(os.path.join(self.content, "index.md"), "w") as f:
+            f.write("# Home")
+        with open(os.path.join(static, "style.css"), "w") as f:
+            f.write("body {}")
+        template = os.path.join(root, "template.html")
+        with open(template, "w") as f:
+            f.write("<html><body>{{ Content }}</body></html>")
+
+        self.server = DevServer(("127.0.0.1", 0), self.content, static, template)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.port = self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def get(self, path, headers=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.port)
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_render_and_conditional(self):
+        response, body = self.get("/")
+        self.assertEqual(response.status, 200)
+        self.assertIn(b'<h1 id="home">Home</h1>', body)
+        self.assertIn(b"EventSource", body)
+        etag = response.getheader("ETag")
+
+        response, body = self.get("/", {"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+        self.assertEqual(self.server.cache.hits, 1)
+
+    def test_rerender_on_change(self):
+        self.get("/")
+        path = os.path.join(self.content, "index.md")
+        with open(path, "w") as f:
+            f.write("# Changed")
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        _, body = self.get("/")
+        self.assertIn(b'<h1 id="changed">Changed</h1>', body)
+
+    def test_rerender_on_included_change(self):
+        snippet = os.path.join(self.directory.name, "snippets", "note.md")
+        os.makedirs(os.path.dirname(snippet))
+        with open(snippet, "w") as f:
+            f.write("old note")
+        with open(os.path.join(self.content, "page.md"), "w") as f:
+            f.write('# Page\n\n{% include "/snippets/note.md" %}')
+        _, body = self.get("/page.html")
+        self.assertIn(b"<p>old note</p>", body)
+        with open(snippet, "w") as f:
+            f.write("new note")
+        os.utime(snippet, ns=(0, os.stat(snippet).st_mtime_ns + 1))
+        _, body = self.get("/page.html")
+        self.assertIn(b"<p>new note</p>", body)
+        # The live reload watcher sees snippets outside the content directory
+        latest = self.server.latest_mtime()
+        os.utime(snippet, ns=(0, latest + 1))
+        self.assertEqual(self.server.latest_mtime(), latest + 1)
+
+    def test_edit_during_render_is_not_cached(self):
+        path = os.path.join(self.content, "index.md")
+        render = self.server.includes.markdown_to_html_node
+
+        def render_and_edit(*args):
+            node = render(*args)
+            with open(path, "w") as f:
+                f.write("# Edited")
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+            return node
+
+        self.server.includes.markdown_to_html_node = render_and_edit
+        _, body = self.get("/")
+        self.assertIn(b'<h1 id="home">Home</h1>', body)
+        self.server.includes.markdown_to_html_node = render
+        _, body = self.get("/")
+        self.assertIn(b'<h1 id="edited">Edited</h1>', body)
+
+    def test_render_error(self):
+        with open(os.path.join(self.content, "broken.md"), "w") as f:
+            f.write("no title here")
+        response, body = self.get("/broken.html")
+        self.assertEqual(response.status, 500)
+        self.assertIn(b"ValueError: no title found", body)
+        response, _ = self.get("/")
+        self.assertEqual(response.status, 200)
+
+    def test_static_and_missing(self):
+        response, body = self.get("/style.css")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "text/css")
+        self.assertEqual(body, b"body {}")
+        response, _ = self.get("/missing.html")
+        self.assertEqual(response.status, 404)
+        response, _ = self.get("/../template.html")
+        self.assertEqual(response.status, 404)
+
+    def test_load_test(self):
+        stats = load_test(f"http://127.0.0.1:{self.port}/", clients=2, requests=5, conditional=True)
+        self.assertEqual(stats["requests"], 10)
+        self.assertEqual(stats["statuses"], {200: 2, 304: 8})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+from docast import (
+    HEADING,
+    IMAGE,
+    TEXT,
+    add_heading_ids,
+    lazy_load_images,
+    parse_block,
+    parse_document,
+    rewrite_links,
+    run_passes,
+    to_html,
+    to_html_node,
+)
+from headings import HeadingCollector
+from htmlnode import StreamingParentNode
+from markdown_blocks import block_to_html_node, markdown_to_html_node
+
+MARKDOWN = """---
+title: Sample
+---
+# The **Title**
+
+This is **bolded** paragraph
+text with a [link](/a.html) and
+an ![image](/img.png)
+
+> A quote
+> over _two_ lines
+
+- one
+- `two`
+
+1. first
+2. second
+
+```python
+x = None
+```
+
+```
+plain
+```
+
+| a | b |
+| - | -: |
+| **x** | y \\| z |
+| only |
+
+## The Title
+"""
+
+
+class TestDocAST(unittest.TestCase):
+    def test_matches_html_node_pipeline(self):
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+        doc = parse_document(MARKDOWN)
+        self.assertEqual(to_html(doc), expected)
+        self.assertEqual(to_html_node(doc).to_html(), expected)
+
+    def test_html_node_view(self):
+        headings = HeadingCollector()
+        node = markdown_to_html_node("# A\n\n| a |\n| - |\n| 1 |\n| 2 |", headings)
+        tbody = node.children[1].children[1]
+        self.assertIsInstance(tbody, StreamingParentNode)
+        self.assertEqual("".join(tbody.iter_html()), "<tbody><tr><td>1</td></tr><tr><td>2</td></tr></tbody>")
+        self.assertEqual(headings.ids(), ["a"])
+        # Blocks parsed one at a time share the page's collector
+        self.assertEqual(block_to_html_node("# A", headings).to_html(), '<h1 id="a-1">A</h1>')
+        self.assertEqual(to_html(parse_block("# A")), '<div><h1 id="a">A</h1></div>')
+
+    def test_pipes_in_prose_are_not_a_table(self):
+        markdown = "Use a|b or c\n|-"
+        self.assertEqual(to_html(parse_document(markdown)), "<div><p>Use a|b or c |-</p></div>")
+        self.assertEqual(markdown_to_html_node(markdown).to_html(), "<div><p>Use a|b or c |-</p></div>")
+
+    def test_offsets_point_into_source(self):
+        doc = parse_document("# Hello **world**\n\n- item")
+        self.assertEqual(doc.kind[1], HEADING)
+        self.assertEqual([doc.text(i) for i in range(len(doc)) if doc.kind[i] == TEXT], ["Hello ", "", "item"])
+        self.assertEqual(doc.buffer, doc.source)
+
+    def test_passes(self):
+        doc = parse_document(MARKDOWN)
+        run_passes(doc, [
+            add_heading_ids,
+            lazy_load_images,
+            lambda doc: rewrite_links(doc, lambda url: "/docs" + url),
+        ])
+        html = to_html(doc)
+        self.assertIn('<h1 id="the-title">', html)
+        self.assertIn('<h2 id="the-title-1">', html)
+        self.assertIn('<a href="/docs/a.html">link</a>', html)
+        self.assertIn('<img src="/docs/img.png" alt="image" loading="lazy"></img>', html)
+        self.assertEqual(to_html_node(doc).to_html(), html)
+        self.assertEqual(sum(1 for kind in doc.kind if kind == IMAGE), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import gzip
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from feeds import AtomFeedWriter, RssFeedWriter
+
+
+class TestFeeds(unittest.TestCase):
+    def test_atom(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "feed.xml")
+            with AtomFeedWriter(path, "Site", "https://example.com", "2024-01-02T00:00:00Z") as feed:
+                feed.add("Post <1>", "/post.html", "2024-01-01T00:00:00Z", "summary")
+            root = ET.parse(path).getroot()
+            ns = {"atom": "http://www.w3.org/2005/Atom"}
+            entries = root.findall("atom:entry", ns)
+            self.assertEqual(len(entries), 1)
+            self.assertEqual(entries[0].find("atom:title", ns).text, "Post <1>")
+            self.assertEqual(entries[0].find("atom:link", ns).get("href"), "https://example.com/post.html")
+
+    def test_rss_gzip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rss.xml.gz")
+            with RssFeedWriter(path, "Site", "https://example.com") as feed:
+                feed.add("A", "/a.html")
+                feed.add("B", "/b.html", description="b")
+            with gzip.open(path) as f:
+                root = ET.parse(f).getroot()
+            self.assertEqual([item.find("title").text for item in root.iter("item")], ["A", "B"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+from frontmatter import MetadataIndex, read_front_matter, split_front_matter
+from markdown_blocks import markdown_to_html_node
+
+
+PAGE = """---
+title: Hello
+date: 2024-03-01
+tags: [python, "web"]
+---
+# Hello
+
+body text
+"""
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split_front_matter(self):
+        meta, body = split_front_matter(PAGE)
+        self.assertEqual(meta, {"title": "Hello", "date": "2024-03-01", "tags": ["python", "web"]})
+        self.assertEqual(body, "# Hello\n\nbody text\n")
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Hello"), ({}, "# Hello"))
+
+    def test_unclosed(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\ntitle: x\n")
+
+    def test_delimiter_must_be_exact(self):
+        markdown = "---\ntitle: x\n----rule: not the end\n---\nbody"
+        self.assertEqual(split_front_matter(markdown), ({"title": "x", "----rule": "not the end"}, "body"))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "page.md")
+            with open(path, "w") as f:
+                f.write(markdown)
+            self.assertEqual(read_front_matter(path), split_front_matter(markdown)[0])
+        with self.assertRaises(ValueError):
+            split_front_matter("---\ntitle: x\n--- x\nbody")
+
+    def test_markdown_to_html_node_skips_front_matter(self):
+        html = markdown_to_html_node(PAGE).to_html()
+        self.assertEqual(html, '<div><h1 id="hello">Hello</h1><p>body text</p></div>')
+
+    def test_read_front_matter(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "page.md")
+            with open(path, "w") as f:
+                f.write(PAGE)
+            self.assertEqual(read_front_matter(path)["title"], "Hello")
+
+
+class TestMetadataIndex(unittest.TestCase):
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_incremental_update(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = os.path.join(directory, "content")
+            index_path = os.path.join(directory, "index.json")
+            self.write(os.path.join(content, "a.md"), PAGE)
+            self.write(os.path.join(content, "blog", "b.md"), "---\ntitle: B\ndate: 2023-01-01\ntags: [web]\n---\nbody")
+
+            index = MetadataIndex(index_path)
+            self.assertEqual(sorted(index.update(content)), ["a.md", "blog/b.md"])
+            index.save()
+
+            index = MetadataIndex(index_path)
+            self.assertEqual(index.update(content), [])
+            self.assertEqual([path for path, _ in index.entries()], ["a.md", "blog/b.md"])
+            self.assertEqual(index.by_tag(), {"python": ["a.md"], "web": ["a.md", "blog/b.md"]})
+            self.assertEqual(index.by_year(), {"2024": ["a.md"], "2023": ["blog/b.md"]})
+
+            os.remove(os.path.join(content, "a.md"))
+            self.assertEqual(index.update(content), ["a.md"])
+            self.assertEqual(list(index.pages), ["blog/b.md"])
+
+
+if __name__ == "__main__":
+    unittest.main()
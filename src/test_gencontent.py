@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+
+from frontmatter import MetadataIndex
+from gencontent import extract_title, generate_listings, generate_pages_recursive, page_url, render_page
+from headings import HeadingIndex
+
+
+class TestGenContent(unittest.TestCase):
+    def test_extract_title(self):
+        self.assertEqual(extract_title("# Hello\n\ntext"), "Hello")
+        self.assertEqual(extract_title("---\ntitle: Meta\n---\n# Hello"), "Meta")
+        with self.assertRaises(ValueError):
+            extract_title("no title")
+
+    def test_page_url(self):
+        self.assertEqual(page_url("index.md"), "/")
+        self.assertEqual(page_url("blog/index.md"), "/blog/")
+        self.assertEqual(page_url("blog/post.md"), "/blog/post.html")
+
+    def test_generate_pages_recursive(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = os.path.join(directory, "content")
+            os.makedirs(os.path.join(content, "blog"))
+            with open(os.path.join(content, "index.md"), "w") as f:
+                f.write("# Home")
+            with open(os.path.join(content, "blog", "post.md"), "w") as f:
+                f.write("---\ndate: 2024-01-01\n---\n# Post")
+            template = os.path.join(directory, "template.html")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+
+            pages = []
+            public = os.path.join(directory, "public")
+            heading_index = HeadingIndex()
+            generate_pages_recursive(content, template, public, lambda url, meta, path: pages.append((url, meta)), heading_index)
+
+            self.assertEqual(pages, [("/", {}), ("/blog/post.html", {"date": "2024-01-01"})])
+            with open(os.path.join(public, "blog", "post.html")) as f:
+                self.assertEqual(f.read(), '<title>Post</title><div><h1 id="post">Post</h1></div>')
+            self.assertTrue(heading_index.has_anchor("/blog/post.html", "post"))
+
+    def test_render_page_toc(self):
+        _, page = render_page("# A\n\n## B", "<nav>{{ TOC }}</nav>{{ Content }}")
+        self.assertTrue(page.startswith('<nav><ul><li><a href="#a">A</a><ul><li><a href="#b">B</a></li></ul></li></ul></nav>'))
+
+    def test_generate_listings(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = os.path.join(directory, "content")
+            os.makedirs(os.path.join(content, "blog"))
+            with open(os.path.join(content, "blog", "a.md"), "w") as f:
+                f.write("---\ntitle: A\ndate: 2023-05-01\ntags: [web]\n---\n# A")
+            with open(os.path.join(content, "blog", "b.md"), "w") as f:
+                f.write("---\ntitle: B\ndate: 2024-02-01\ntags: [web, Dev Notes]\n---\n# B")
+            template = os.path.join(directory, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Content }}")
+            metadata = MetadataIndex(os.path.join(directory, "metadata.json"))
+            metadata.update(content)
+
+            urls = []
+            public = os.path.join(directory, "public")
+            generate_listings(metadata, template, public, lambda url, meta, path: urls.append(url))
+
+            self.assertEqual(urls, ["/archive/2023/", "/archive/2024/", "/tags/dev-notes/", "/tags/web/"])
+            with open(os.path.join(public, "tags", "web", "index.html")) as f:
+                self.assertEqual(
+                    f.read(),
+                    '<div><h1 id="tagged-web">Tagged web</h1><ul><li><a href="/blog/b.html">B</a></li>'
+                    '<li><a href="/blog/a.html">A</a></li></ul></div>',
+                )
+
+    def test_listings_escape_titles_and_separate_tag_slugs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = os.path.join(directory, "content")
+            os.makedirs(content)
+            with open(os.path.join(content, "a.md"), "w") as f:
+                f.write("---\ntitle: Using my_var <safely>\ntags: [C++, C#]\n---\n# A")
+            template = os.path.join(directory, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Content }}")
+            metadata = MetadataIndex(os.path.join(directory, "metadata.json"))
+            metadata.update(content)
+
+            urls = []
+            public = os.path.join(directory, "public")
+            tag_urls = generate_listings(metadata, template, public, lambda url, meta, path: urls.append(url))
+
+            self.assertEqual(tag_urls, {"C#": "/tags/c/", "C++": "/tags/c-1/"})
+            self.assertEqual(urls, ["/tags/c/", "/tags/c-1/"])
+            with open(os.path.join(public, "tags", "c-1", "index.html")) as f:
+                self.assertEqual(
+                    f.read(),
+                    '<div><h1 id="tagged-c">Tagged C++</h1>'
+                    '<ul><li><a href="/a.html">Using my_var &lt;safely&gt;</a></li></ul></div>',
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
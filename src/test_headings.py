@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from headings import HeadingCollector, HeadingIndex, slugify
+from markdown_blocks import markdown_to_html_node
+
+
+class TestHeadingCollector(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Hello, World!"), "hello-world")
+        self.assertEqual(slugify("  snake_case  and-dash "), "snake-case-and-dash")
+        self.assertEqual(slugify("!!!"), "section")
+
+    def test_duplicates(self):
+        headings = HeadingCollector()
+        ids = [headings.add(2, text) for text in ("Intro", "Intro", "Intro 1", "Intro", "intro-1")]
+        self.assertEqual(ids, ["intro", "intro-1", "intro-1-1", "intro-2", "intro-1-2"])
+
+    def test_collected_while_rendering(self):
+        headings = HeadingCollector()
+        html = markdown_to_html_node("# Install **now**\n\n## Linux\n\n## Linux", headings).to_html()
+        self.assertEqual(
+            html,
+            '<div><h1 id="install-now">Install <b>now</b></h1><h2 id="linux">Linux</h2><h2 id="linux-1">Linux</h2></div>',
+        )
+        self.assertEqual(headings.entries, [(1, "Install now", "install-now"), (2, "Linux", "linux"), (2, "Linux", "linux-1")])
+
+    def test_toc_html(self):
+        headings = HeadingCollector()
+        self.assertEqual(headings.toc_html(), "")
+        for level, text in ((1, "A"), (2, "B"), (3, "C"), (2, "D"), (1, "E")):
+            headings.add(level, text)
+        self.assertEqual(
+            headings.toc_html(),
+            '<ul><li><a href="#a">A</a><ul><li><a href="#b">B</a><ul><li><a href="#c">C</a></li></ul></li>'
+            '<li><a href="#d">D</a></li></ul></li><li><a href="#e">E</a></li></ul>',
+        )
+
+    def test_toc_skipped_levels(self):
+        headings = HeadingCollector()
+        for level, text in ((1, "A"), (3, "C"), (2, "B")):
+            headings.add(level, text)
+        self.assertEqual(
+            headings.toc_html(),
+            '<ul><li><a href="#a">A</a><ul><li><a href="#c">C</a></li><li><a href="#b">B</a></li></ul></li></ul>',
+        )
+
+
+class TestHeadingIndex(unittest.TestCase):
+    def test_broken_anchor_links(self):
+        index = HeadingIndex({"/": ["intro"], "/guide.html": ["setup"]})
+        links = ["#intro", "#missing", "/guide.html#setup", "/guide.html#nope", "/other.html#x", "/guide.html", "https://x.dev/#y"]
+        self.assertEqual(index.broken_anchor_links("/", links), ["#missing", "/guide.html#nope", "/other.html#x"])
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "headings.json")
+            index = HeadingIndex()
+            index.add("/", ["b", "a"])
+            index.save(path)
+            self.assertTrue(HeadingIndex.load(path).has_anchor("/", "a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
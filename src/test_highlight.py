@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+
+import highlight
+from highlight import HighlightCache, RegexLexer, register_lexer, use_cache_dir, LEXERS, LEXER_IDS
+from markdown_blocks import markdown_to_html_node
+
+
+class TestHighlight(unittest.TestCase):
+    def tearDown(self):
+        highlight.set_cache(None)
+
+    def test_python(self):
+        html = highlight.highlight('def f():\n    return "x" # done\n', "python")
+        self.assertEqual(
+            html,
+            '<span class="tok-keyword">def</span> f():\n    <span class="tok-keyword">return</span> '
+            '<span class="tok-string">"x"</span> <span class="tok-comment"># done</span>\n',
+        )
+
+    def test_escapes_html(self):
+        html = highlight.highlight("a < b && c", "js")
+        self.assertEqual(html, "a &lt; b &amp;&amp; c")
+
+    def test_unknown_language(self):
+        self.assertIsNone(highlight.highlight("code", "brainfuck"))
+        self.assertIsNone(highlight.highlight("code", ""))
+
+    def test_register_lexer(self):
+        register_lexer("upper", lambda code: code.upper(), ("up",))
+        try:
+            self.assertEqual(highlight.highlight("abc", "UP"), "ABC")
+        finally:
+            for name in ("upper", "up"):
+                del LEXERS[name]
+                del LEXER_IDS[name]
+
+    def test_regex_lexer(self):
+        lexer = RegexLexer([("number", r"\d+")])
+        self.assertEqual(lexer("x1"), 'x<span class="tok-number">1</span>')
+
+
+class TestHighlightCache(unittest.TestCase):
+    def test_cache_hit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = HighlightCache(directory)
+            highlight.set_cache(cache)
+            try:
+                first = highlight.highlight("x = 1\n", "python")
+                self.assertEqual(cache.get("python", "x = 1\n", LEXER_IDS["python"]), first)
+                # A fresh cache over the same directory sees the entry
+                self.assertEqual(len(HighlightCache(directory)), 1)
+            finally:
+                highlight.set_cache(None)
+
+    def test_reregistered_lexer_misses(self):
+        with tempfile.TemporaryDirectory() as directory:
+            highlight.set_cache(HighlightCache(directory))
+            try:
+                register_lexer("shout", lambda code: code.upper())
+                self.assertEqual(highlight.highlight("abc", "shout"), "ABC")
+                register_lexer("shout", lambda code: code[::-1])
+                self.assertEqual(highlight.highlight("abc", "shout"), "cba")
+                register_lexer("shout", RegexLexer([("number", r"\d+")]), version=2)
+                self.assertEqual(highlight.highlight("1", "shout"), '<span class="tok-number">1</span>')
+            finally:
+                highlight.set_cache(None)
+                del LEXERS["shout"]
+                del LEXER_IDS["shout"]
+
+    def test_use_cache_dir(self):
+        with tempfile.TemporaryDirectory() as directory:
+            try:
+                use_cache_dir(os.path.join(directory, "highlight"))
+                cache = highlight._cache
+                self.assertIsNotNone(cache)
+                use_cache_dir(os.path.join(directory, "highlight"))
+                self.assertIs(highlight._cache, cache)
+                highlight.highlight("x = 1\n", "python")
+                self.assertEqual(len(os.listdir(os.path.join(directory, "highlight"))), 1)
+            finally:
+                highlight.set_cache(None)
+
+    def test_cache_eviction(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = HighlightCache(directory, max_entries=2)
+            cache.put("python", "a", "A")
+            cache.put("python", "b", "B")
+            cache.get("python", "a")
+            cache.put("python", "c", "C")
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(len(os.listdir(directory)), 2)
+            self.assertIsNone(cache.get("python", "b"))
+            self.assertEqual(cache.get("python", "a"), "A")
+            self.assertEqual(cache.get("python", "c"), "C")
+
+    def test_shared_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = HighlightCache(directory, max_entries=4)
+            second = HighlightCache(directory, max_entries=4)
+            for i in range(4):
+                first.put("python", f"a{i}", "A")
+            for i in range(5):
+                second.put("python", f"b{i}", "B")
+            # second re-scanned before evicting, so first's entries count too
+            self.assertEqual(len(os.listdir(directory)), 4)
+            self.assertEqual(second.get("python", "b4"), "B")
+
+    def test_scan_skips_vanished_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            HighlightCache(directory).put("python", "a", "A")
+            listdir = os.listdir
+            # Another process evicts a file between listdir and stat
+            highlight.os.listdir = lambda path: listdir(path) + ["gone.html"]
+            try:
+                self.assertEqual(len(HighlightCache(directory)), 1)
+            finally:
+                highlight.os.listdir = listdir
+
+    def test_language_class_is_normalized(self):
+        html = markdown_to_html_node("```Python\nx = 1\n```").to_html()
+        self.assertIn('<code class="language-python">', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, StreamingParentNode
 
 class TestHTMLNode(unittest.TestCase):
     def test_to_html_props(self):
@@ -78,6 +78,11 @@ class TestHTMLNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_to_html_parent_props(self):
+        child_node = LeafNode("span", "child")
+        parent_node = ParentNode("div", [child_node], {"class": "box"})
+        self.assertEqual(parent_node.to_html(), '<div class="box"><span>child</span></div>')
+
     def test_parent_node_no_tag(self):
         """Test that ParentNode raises ValueError when tag is None"""
         child_node = LeafNode("span", "child")
@@ -121,5 +126,21 @@ class TestHTMLNode(unittest.TestCase):
             "<section><p><b>bold</b><i>italic</i></p><div><u>underline</u></div></section>"
         )
 
+    def test_streaming_parent_node(self):
+        built = []
+
+        def rows():
+            for i in range(3):
+                built.append(i)
+                yield LeafNode("li", str(i))
+
+        node = ParentNode("div", [StreamingParentNode("ul", rows, {"class": "x"})])
+        self.assertEqual(built, [])
+        self.assertEqual(
+            "".join(node.iter_html()),
+            '<div><ul class="x"><li>0</li><li>1</li><li>2</li></ul></div>',
+        )
+        self.assertEqual(node.to_html(), '<div><ul class="x"><li>0</li><li>1</li><li>2</li></ul></div>')
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
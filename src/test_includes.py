@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+
+import includes
+from headings import HeadingCollector
+from includes import FragmentRenderer, IncludeGraph
+from markdown_blocks import markdown_to_blocks
+
+
+class TestIncludes(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def render(self, renderer, path):
+        with open(path) as f:
+            return renderer.markdown_to_html_node(path, f.read()).to_html()
+
+    def test_include_memoized(self):
+        self.write("snippets/warning.md", "> **Careful** now\n\n{% include \"note.md\" %}")
+        self.write("snippets/note.md", "a _note_")
+        page_a = self.write("content/a.md", "# A\n\n{% include \"/snippets/warning.md\" %}")
+        page_b = self.write("content/b.md", "{% include \"../snippets/warning.md\" %}\n\ntext")
+        renderer = FragmentRenderer(self.root)
+
+        self.assertEqual(
+            self.render(renderer, page_a),
+            '<div><h1 id="a">A</h1><blockquote><b>Careful</b> now</blockquote><p>a <i>note</i></p></div>',
+        )
+        self.assertEqual(
+            self.render(renderer, page_b),
+            "<div><blockquote><b>Careful</b> now</blockquote><p>a <i>note</i></p><p>text</p></div>",
+        )
+        self.assertEqual(renderer.renders, 2)
+        self.assertEqual(renderer.reuses, 1)
+
+        # Editing a nested snippet invalidates the fragments above it
+        self.write("snippets/note.md", "changed")
+        self.assertIn("<p>changed</p>", self.render(renderer, page_a))
+        self.assertEqual(renderer.renders, 4)
+
+        note = os.path.join(self.root, "snippets", "note.md")
+        self.assertEqual(renderer.graph.dependents([note]), {
+            os.path.join(self.root, "snippets", "warning.md"),
+            os.path.normpath(page_a),
+            os.path.normpath(page_b),
+        })
+        self.assertIn(note, renderer.graph.includes(os.path.normpath(page_b)))
+
+    def test_fragment_headings_use_page_ids(self):
+        self.write("snippets/install.md", "## Install\n\nrun it")
+        page = self.write("content/page.md", '# Page\n\n## Install\n\n{% include "/snippets/install.md" %}')
+        renderer = FragmentRenderer(self.root)
+        headings = HeadingCollector()
+        with open(page) as f:
+            html = renderer.markdown_to_html_node(page, f.read(), headings).to_html()
+        self.assertEqual(
+            html,
+            '<div><h1 id="page">Page</h1><h2 id="install">Install</h2><h2 id="install-1">Install</h2><p>run it</p></div>',
+        )
+        self.assertEqual(headings.ids(), ["page", "install", "install-1"])
+        # A reused fragment still takes its ids from the new page
+        other = self.write("content/other.md", '{% include "/snippets/install.md" %}')
+        self.assertIn('<h2 id="install">Install</h2>', self.render(renderer, other))
+        self.assertEqual(renderer.reuses, 1)
+
+    def test_include_in_code_block(self):
+        example = '```\n{% include "missing.md" %}\n```'
+        page = self.write("page.md", "# Docs\n\n" + example)
+        renderer = FragmentRenderer(self.root)
+        self.assertEqual(
+            self.render(renderer, page),
+            '<div><h1 id="docs">Docs</h1><pre><code>{% include "missing.md" %}\n</code></pre></div>',
+        )
+        self.assertEqual(renderer.graph.includes(os.path.normpath(page)), set())
+        self.assertEqual(renderer.content_key(page)[1], "# Docs\n\n" + example)
+        # Documenting the include syntax with the file's own name is not a cycle
+        self_page = self.write("self.md", '# Self\n\n```\n{% include "self.md" %}\n```')
+        self.assertIn("<pre><code>", self.render(renderer, self_page))
+
+    def test_fragments_bounded(self):
+        for i in range(3):
+            self.write(f"snippets/{i}.md", f"snippet {i}")
+        page = self.write("page.md", "\n\n".join(f'{{% include "snippets/{i}.md" %}}' for i in range(3)))
+        renderer = FragmentRenderer(self.root, max_fragments=2)
+        self.assertIn("<p>snippet 2</p>", self.render(renderer, page))
+        self.assertEqual(len(renderer.fragments), 2)
+
+    def test_sources_parsed_once(self):
+        self.write("snippets/note.md", "## Note\n\nshared")
+        pages = [self.write(f"content/{i}.md", f'# Page {i}\n\n{{% include "/snippets/note.md" %}}') for i in range(100)]
+        renderer = FragmentRenderer(self.root)
+        calls = []
+
+        def counting_markdown_to_blocks(markdown):
+            calls.append(markdown)
+            return markdown_to_blocks(markdown)
+
+        includes.markdown_to_blocks = counting_markdown_to_blocks
+        try:
+            for page in pages:
+                self.render(renderer, page)
+        finally:
+            includes.markdown_to_blocks = markdown_to_blocks
+        # Once per page and once for the snippet
+        self.assertEqual(len(calls), 101)
+        self.assertEqual(renderer.renders, 1)
+
+    def test_cycle(self):
+        self.write("a.md", "{% include \"b.md\" %}")
+        self.write("b.md", "{% include \"a.md\" %}")
+        page = self.write("page.md", "{% include \"a.md\" %}")
+        with self.assertRaises(ValueError) as context:
+            self.render(FragmentRenderer(self.root), page)
+        self.assertIn("include cycle", str(context.exception))
+
+    def test_graph_save_load(self):
+        graph = IncludeGraph()
+        graph.record("page.md", ["snippet.md"])
+        path = os.path.join(self.root, "graph.json")
+        graph.save(path)
+        self.assertEqual(IncludeGraph.load(path).dependents(["snippet.md"]), {"page.md"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ from markdown_blocks import (
     markdown_to_blocks,
     block_to_block_type,
     BlockType,
+    table_row_spans,
 )
 
 
@@ -62,6 +63,12 @@ This is the same paragraph on a new line
         self.assertEqual(block_to_block_type(block), BlockType.ULIST)
         block = "1. list\n2. items"
         self.assertEqual(block_to_block_type(block), BlockType.OLIST)
+        block = "| a | b |\n| --- | :-: |\n| 1 | 2 |"
+        self.assertEqual(block_to_block_type(block), BlockType.TABLE)
+        block = "a | b\nnot a delimiter"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+        block = "Use a|b or c\n|-"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
         block = "paragraph"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
@@ -129,7 +136,7 @@ this is paragraph text
         html = node.to_html()
         self.assertEqual(
             html,
-            "<div><h1>this is an h1</h1><p>this is paragraph text</p><h2>this is an h2</h2></div>",
+            '<div><h1 id="this-is-an-h1">this is an h1</h1><p>this is paragraph text</p><h2 id="this-is-an-h2">this is an h2</h2></div>',
         )
 
     def test_blockquote(self):
@@ -163,6 +170,44 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_code_highlighted(self):
+        md = """
+```python
+x = None
+```
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            '<div><pre><code class="language-python">x = <span class="tok-keyword">None</span>\n</code></pre></div>',
+        )
+
+    def test_table(self):
+        md = """
+| Name | Value | Note |
+| :--- | ---: | :-: |
+| **a** | 1 | `x` |
+| b \\| c | 2 |
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            '<div><table><thead><tr><th align="left">Name</th><th align="right">Value</th><th align="center">Note</th></tr></thead>'
+            '<tbody><tr><td align="left"><b>a</b></td><td align="right">1</td><td align="center"><code>x</code></td></tr>'
+            '<tr><td align="left">b | c</td><td align="right">2</td><td align="center"></td></tr></tbody></table></div>',
+        )
+        self.assertEqual("".join(node.iter_html()), html)
+
+    def test_table_row_spans(self):
+        line = "| a |  bb | c"
+        self.assertEqual([line[start:end] for start, end in table_row_spans(line)], ["a", "bb", "c"])
+        line = "a \\| b | |"
+        self.assertEqual([line[start:end] for start, end in table_row_spans(line)], ["a \\| b", ""])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+import unittest
+
+from sharding import (
+    build_shard,
+    build_sharded_local,
+    manifest_path,
+    merge_shards,
+    parse_shard,
+    partition,
+    shard_manifest_paths,
+)
+
+
+class TestPartition(unittest.TestCase):
+    def test_deterministic(self):
+        paths = [f"docs/page-{i}.md" for i in range(100)]
+        shards = partition(paths, 4)
+        self.assertEqual(sorted(path for shard in shards for path in shard), sorted(paths))
+        self.assertTrue(all(shards))
+        self.assertEqual(partition(paths, 4), shards)
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("1/4"), (0, 4))
+        self.assertEqual(parse_shard("4/4"), (3, 4))
+        for value in ("0/4", "5/4", "1", "a/b", "1/0"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+
+class TestShardedBuild(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        root = self.directory.name
+        self.content = os.path.join(root, "content")
+        os.makedirs(os.path.join(self.content, "blog"))
+        for i in range(6):
+            with open(os.path.join(self.content, "blog", f"post-{i}.md"), "w") as f:
+                f.write(f"# Post {i}\n\nSee [home](/)")
+        with open(os.path.join(self.content, "index.md"), "w") as f:
+            f.write("---\ndate: 2024-01-01\n---\n# Home")
+        self.template = os.path.join(root, "template.html")
+        with open(self.template, "w") as f:
+            f.write("{{ Content }}")
+        self.public = os.path.join(root, "public")
+        self.shards = os.path.join(root, "shards")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_local_build_and_merge(self):
+        pages = build_sharded_local(self.content, self.template, self.public, 3, self.shards, "https://example.com", processes=2)
+        self.assertEqual(len(pages), 7)
+        self.assertTrue(os.path.exists(os.path.join(self.public, "blog", "post-5.html")))
+        with open(os.path.join(self.public, "links.json")) as f:
+            self.assertEqual(json.load(f)["/blog/post-0.html"], ["/"])
+        with open(os.path.join(self.public, "search-index.json")) as f:
+            self.assertEqual(json.load(f)[0], {"url": "/", "title": "Home", "tags": []})
+        self.assertTrue(os.path.exists(os.path.join(self.public, "sitemap-1.xml.gz")))
+        with open(os.path.join(self.public, "headings.json")) as f:
+            self.assertEqual(json.load(f)["/blog/post-3.html"], ["post-3"])
+        with open(os.path.join(self.public, "feed.xml")) as f:
+            feed = f.read()
+        self.assertEqual(feed.count("<entry>"), 1)
+        self.assertIn("<title>Home</title><link href=\"https://example.com/\"/>", feed)
+        with open(os.path.join(self.public, "archive", "2024", "index.html")) as f:
+            self.assertIn('<a href="/">Home</a>', f.read())
+
+    def test_shard_manifest_paths(self):
+        for shard in range(2):
+            build_shard(self.content, self.template, self.public, shard, 2, self.shards)
+        build_shard(self.content, self.template, self.public, 0, 3, self.shards)
+        paths = shard_manifest_paths(self.shards, 2)
+        self.assertEqual([os.path.basename(path) for path in paths], ["shard-1-of-2.json", "shard-2-of-2.json"])
+        self.assertEqual(len(merge_shards(paths, self.public, "https://example.com")), 7)
+        with self.assertRaises(ValueError) as context:
+            shard_manifest_paths(self.shards, 3)
+        self.assertIn("[2, 3]", str(context.exception))
+
+    def test_incremental_rebuild(self):
+        snippet = os.path.join(self.directory.name, "snippets", "note.md")
+        os.makedirs(os.path.dirname(snippet))
+        with open(snippet, "w") as f:
+            f.write("old note")
+        with open(os.path.join(self.content, "blog", "post-1.md"), "w") as f:
+            f.write('# Post 1\n\n{% include "/snippets/note.md" %}')
+        build_shard(self.content, self.template, self.public, 0, 1, self.shards)
+
+        def outputs_rewritten(edit):
+            outputs = []
+            for root, _, files in os.walk(self.public):
+                for name in files:
+                    outputs.append(os.path.join(root, name))
+                    os.utime(outputs[-1], ns=(0, 0))
+            edit()
+            build_shard(self.content, self.template, self.public, 0, 1, self.shards)
+            return sorted(
+                os.path.relpath(path, self.public) for path in outputs
+                if not os.path.exists(path) or os.stat(path).st_mtime_ns != 0
+            )
+
+        def edit_snippet():
+            with open(snippet, "w") as f:
+                f.write("new note!")
+
+        def delete_page():
+            os.remove(os.path.join(self.content, "blog", "post-2.md"))
+
+        def touch_template():
+            os.utime(self.template, ns=(0, os.stat(self.template).st_mtime_ns + 1))
+
+        self.assertEqual(outputs_rewritten(lambda: None), [])
+        self.assertEqual(outputs_rewritten(edit_snippet), [os.path.join("blog", "post-1.html")])
+        with open(os.path.join(self.public, "blog", "post-1.html")) as f:
+            self.assertIn("new note!", f.read())
+        self.assertEqual(outputs_rewritten(delete_page), [os.path.join("blog", "post-2.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "post-2.html")))
+        self.assertEqual(len(outputs_rewritten(touch_template)), 6)
+        with open(manifest_path(self.shards, 0, 1)) as f:
+            self.assertEqual(len(json.load(f)["pages"]), 6)
+
+    def test_missing_shard(self):
+        path = build_shard(self.content, self.template, self.public, 0, 2, self.shards)
+        with self.assertRaises(ValueError):
+            merge_shards([path], self.public, "https://example.com")
+
+    def test_collision(self):
+        first = build_shard(self.content, self.template, self.public, 0, 2, self.shards)
+        second = build_shard(self.content, self.template, self.public, 1, 2, self.shards)
+        with open(first) as f:
+            manifest = json.load(f)
+        with open(second) as f:
+            other = json.load(f)
+        other["pages"].append(manifest["pages"][0])
+        with open(second, "w") as f:
+            json.dump(other, f)
+        with self.assertRaises(ValueError) as context:
+            merge_shards([first, second], self.public, "https://example.com")
+        self.assertIn("output collisions", str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
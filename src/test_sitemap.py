@@ -0,0 +1,46 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from sitemap import SitemapWriter
+
+
+class TestSitemapWriter(unittest.TestCase):
+    def read_shard(self, directory, name):
+        with gzip.open(os.path.join(directory, name), "rt") as f:
+            return f.read()
+
+    def test_single_shard(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with SitemapWriter(directory, "https://example.com/") as sitemap:
+                sitemap.add("/", "2024-01-01")
+                sitemap.add("/a&b.html")
+            self.assertEqual(sitemap.shards, ["sitemap-1.xml.gz"])
+            shard = self.read_shard(directory, "sitemap-1.xml.gz")
+            self.assertIn("<url><loc>https://example.com/</loc><lastmod>2024-01-01</lastmod></url>", shard)
+            self.assertIn("<loc>https://example.com/a&amp;b.html</loc>", shard)
+            self.assertTrue(shard.endswith("</urlset>\n"))
+            with open(os.path.join(directory, "sitemap.xml")) as f:
+                self.assertIn("<loc>https://example.com/sitemap-1.xml.gz</loc>", f.read())
+
+    def test_shards_by_url_count(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with SitemapWriter(directory, "https://example.com", max_urls=2) as sitemap:
+                for i in range(5):
+                    sitemap.add(f"/{i}.html")
+            self.assertEqual(len(sitemap.shards), 3)
+            self.assertEqual(self.read_shard(directory, "sitemap-3.xml.gz").count("<url>"), 1)
+
+    def test_shards_by_size(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with SitemapWriter(directory, "https://example.com", max_bytes=300) as sitemap:
+                for i in range(10):
+                    sitemap.add(f"/{i}.html")
+            self.assertGreater(len(sitemap.shards), 1)
+            for name in sitemap.shards:
+                self.assertLessEqual(len(self.read_shard(directory, name).encode()), 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
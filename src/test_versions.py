@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from versions import build_versions
+
+
+class TestVersionedBuild(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.versions = os.path.join(self.root, "versions")
+        self.public = os.path.join(self.root, "public")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def read(self, rel_path):
+        with open(os.path.join(self.public, rel_path)) as f:
+            return f.read()
+
+    def test_renders_each_unique_source_once(self):
+        for version in ("1.0", "2.0", "3.0"):
+            self.write(f"versions/{version}/index.md", "# Docs for {{ Version }}")
+            self.write(f"versions/{version}/guide.md", "# Guide\n\nSame everywhere")
+        self.write("versions/3.0/new.md", "# New in 3")
+        self.write("versions/3.0/guide.md", "# Guide\n\nRewritten")
+        template = self.write("template.html", "{{ Content }}")
+
+        report = build_versions(self.versions, template, self.public, {"2.0": {"Version": "2.0 LTS"}})
+
+        self.assertEqual((report.pages, report.rendered, report.reused), (7, 4, 3))
+        self.assertEqual(self.read("2.0/index.html"), '<div><h1 id="docs-for-version">Docs for 2.0 LTS</h1></div>')
+        self.assertEqual(self.read("3.0/index.html"), '<div><h1 id="docs-for-version">Docs for 3.0</h1></div>')
+        self.assertIn("Rewritten", self.read("3.0/guide.html"))
+        self.assertEqual(report.linked, 1)
+        first = os.stat(os.path.join(self.public, "1.0", "guide.html"))
+        second = os.stat(os.path.join(self.public, "2.0", "guide.html"))
+        self.assertEqual((first.st_ino, first.st_dev), (second.st_ino, second.st_dev))
+
+        # A rebuild must not write through the links into other versions
+        self.write("versions/2.0/guide.md", "# Guide\n\nPatched")
+        build_versions(self.versions, template, self.public)
+        self.assertIn("Same everywhere", self.read("1.0/guide.html"))
+        self.assertIn("Patched", self.read("2.0/guide.html"))
+
+    def test_includes_are_part_of_the_key(self):
+        for version in ("1.0", "2.0"):
+            self.write(f"versions/{version}/index.md", '# Home\n\n{% include "install.md" %}')
+            self.write(f"versions/{version}/install.md", f"# Install\n\ninstall {version}")
+        template = self.write("template.html", "{{ Content }}")
+        report = build_versions(self.versions, template, self.public)
+        self.assertIn("install 1.0", self.read("1.0/index.html"))
+        self.assertIn("install 2.0", self.read("2.0/index.html"))
+        # Identical index.md sources, but each includes a different snippet
+        self.assertEqual(report.rendered, 4)
+
+    def test_include_example_in_code_block(self):
+        example = '# Includes\n\n```\n{% include "snippets/missing.md" %}\n```'
+        for version in ("1.0", "2.0"):
+            self.write(f"versions/{version}/includes.md", example)
+        template = self.write("template.html", "{{ Content }}")
+        report = build_versions(self.versions, template, self.public)
+        self.assertEqual(report.rendered, 1)
+        self.assertIn('<pre><code>{% include "snippets/missing.md" %}\n</code></pre>', self.read("2.0/includes.html"))
+
+    def test_variables_not_substituted_in_code(self):
+        self.write("versions/1.0/index.md", "# Docs {{ Version }}\n\nUse `{{ Version }}` in templates:\n\n```\n<p>{{ Version }}</p>\n```")
+        template = self.write("template.html", "<title>{{ Version }}</title>{{ Content }}")
+        build_versions(self.versions, template, self.public)
+        self.assertEqual(
+            self.read("1.0/index.html"),
+            '<title>1.0</title><div><h1 id="docs-version">Docs 1.0</h1>'
+            "<p>Use <code>{{ Version }}</code> in templates:</p><pre><code><p>{{ Version }}</p>\n</code></pre></div>",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
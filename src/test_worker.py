@@ -0,0 +1,110 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from worker import ConversionWorker, serve_unix_socket
+
+
+class TestConversionWorker(unittest.TestCase):
+    def setUp(self):
+        self.worker = ConversionWorker(workers=2, batch_size=4)
+
+    def tearDown(self):
+        self.worker.close()
+
+    def test_handle_batch(self):
+        lines = [
+            json.dumps({"id": 1, "markdown": "# Hi\n\n**bold**", "options": {"toc": True}}),
+            "not json",
+            json.dumps({"id": 2, "markdown": "# Hi\n\n**bold**", "options": {"toc": True}}),
+            json.dumps({"id": 3}),
+        ]
+        responses = self.worker.handle_batch(lines)
+        self.assertEqual(responses[0], {
+            "id": 1,
+            "html": '<div><h1 id="hi">Hi</h1><p><b>bold</b></p></div>',
+            "toc": '<ul><li><a href="#hi">Hi</a></li></ul>',
+        })
+        self.assertIsNone(responses[1]["id"])
+        self.assertIn("error", responses[1])
+        self.assertEqual(responses[2]["html"], responses[0]["html"])
+        self.assertEqual(responses[3], {"id": 3, "error": "markdown must be a string"})
+
+        responses = self.worker.handle_batch([json.dumps({"id": 4, "markdown": "# Hi\n\n**bold**", "options": {"toc": True}})])
+        self.assertEqual(responses[0]["id"], 4)
+        stats = self.worker.handle_batch([json.dumps({"id": "s", "stats": True})])[0]["stats"]
+        self.assertEqual(stats["cache_hits"], 1)
+        self.assertEqual(stats["cache_misses"], 1)
+        self.assertEqual(stats["requests"], 5)
+        self.assertGreaterEqual(stats["p99_ms"], stats["p50_ms"])
+
+    def test_invalid_requests(self):
+        lines = ["[1, 2]", '"text"', "null", json.dumps({"id": 5, "markdown": "# Hi", "options": [1]})]
+        responses = self.worker.handle_batch(lines)
+        for response in responses[:3]:
+            self.assertEqual(response, {"id": None, "error": "request must be a json object"})
+        self.assertEqual(responses[3], {"id": 5, "error": "options must be an object"})
+        self.assertEqual(self.worker.handle_batch([json.dumps({"id": 6, "markdown": "# Hi"})])[0]["id"], 6)
+
+    def test_render_error(self):
+        response = self.worker.handle_batch([json.dumps({"id": 1, "markdown": "**unclosed"})])[0]
+        self.assertEqual(response["id"], 1)
+        self.assertIn("Unmatched delimiter", response["error"])
+
+    def test_serve_stream(self):
+        requests = "".join(json.dumps({"id": i, "markdown": f"text {i}"}) + "\n" for i in range(10))
+        output = io.StringIO()
+        self.worker.serve_stream(io.StringIO(requests), output)
+        responses = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([response["id"] for response in responses], list(range(10)))
+        self.assertEqual(responses[3]["html"], "<div><p>text 3</p></div>")
+
+    def test_serve_stream_bad_bytes(self):
+        requests = b"\xff\xfe not utf-8\n" + json.dumps({"id": 1, "markdown": "caf\u00e9"}).encode() + b"\n"
+        output = io.BytesIO()
+        self.worker.serve_stream(io.BytesIO(requests), output)
+        responses = [json.loads(line) for line in output.getvalue().decode().splitlines()]
+        self.assertIsNone(responses[0]["id"])
+        self.assertIn("invalid json", responses[0]["error"])
+        self.assertEqual(responses[1], {"id": 1, "html": "<div><p>caf\u00e9</p></div>"})
+
+    def test_serve_stream_reader_error(self):
+        def broken_lines():
+            yield json.dumps({"id": 1, "markdown": "ok"}) + "\n"
+            raise OSError("connection reset")
+
+        output = io.StringIO()
+        self.worker.serve_stream(broken_lines(), output)
+        self.assertEqual(json.loads(output.getvalue())["id"], 1)
+
+    def test_process_pool(self):
+        worker = ConversionWorker(workers=1, processes=True)
+        try:
+            response = worker.handle_batch([json.dumps({"id": 1, "markdown": "# Hi"})])[0]
+        finally:
+            worker.close()
+        self.assertEqual(response, {"id": 1, "html": '<div><h1 id="hi">Hi</h1></div>'})
+
+    def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "worker.sock")
+            server = serve_unix_socket(self.worker, path)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                    client.connect(path)
+                    client.sendall((json.dumps({"id": "a", "markdown": "hi"}) + "\n").encode())
+                    client.shutdown(socket.SHUT_WR)
+                    data = client.makefile().read()
+                self.assertEqual(json.loads(data), {"id": "a", "html": "<div><p>hi</p></div>"})
+            finally:
+                server.shutdown()
+                server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
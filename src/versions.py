@@ -0,0 +1,113 @@
+import hashlib
+import os
+import re
+import shutil
+
+from gencontent import page_dest_path, render_page
+from highlight import use_cache_dir
+from includes import FragmentRenderer
+from sharding import list_content
+
+
+class VersionBuildReport:
+    def __init__(self):
+        self.pages = 0
+        self.rendered = 0
+        self.linked = 0
+        self.written = 0
+
+    @property
+    def reused(self):
+        return self.pages - self.rendered
+
+    def saved_fraction(self):
+        return self.reused / self.pages if self.pages else 0.0
+
+    def __repr__(self):
+        return (
+            f"VersionBuildReport({self.pages} pages, {self.rendered} rendered, "
+            f"{self.reused} reused ({self.saved_fraction():.0%} saved), "
+            f"{self.linked} linked, {self.written} written)"
+        )
+
+
+#Rendered code blocks and inline code, where template syntax is shown rather
+#than used, so variables are never substituted inside them
+CODE_RE = re.compile(r"<pre[ >].*?</pre>|<code[ >].*?</code>", re.DOTALL)
+
+
+def _substitute_text(text, variables):
+    for name, value in variables.items():
+        text = text.replace("{{ " + name + " }}", str(value))
+    return text
+
+
+def substitute(page, variables):
+    parts = []
+    pos = 0
+    for match in CODE_RE.finditer(page):
+        parts.append(_substitute_text(page[pos : match.start()], variables))
+        parts.append(match.group())
+        pos = match.end()
+    parts.append(_substitute_text(page[pos:], variables))
+    return "".join(parts)
+
+
+def link_or_copy(source_path, dest_path):
+    #Hard links when possible; falls back to a copy across filesystems
+    if os.path.exists(dest_path):
+        os.remove(dest_path)
+    try:
+        os.link(source_path, dest_path)
+        return True
+    except OSError:
+        shutil.copyfile(source_path, dest_path)
+        return False
+
+
+def build_versions(versions_root, template_path, dest_dir_path, variables=None, highlight_cache_dir=None):
+    #Builds versions_root/<version>/**.md into dest_dir_path/<version>/. Pages
+    #with the same source (including everything they include) are rendered
+    #once; only the per-version variables, {{ Version }} plus anything in
+    #variables[version], are substituted for each copy. Copies that end up
+    #byte-identical are hard linked to the first one written.
+    use_cache_dir(highlight_cache_dir)
+    with open(template_path, encoding="utf-8") as f:
+        template = f.read()
+    includes = FragmentRenderer(os.path.dirname(os.path.abspath(versions_root)))
+    versions = sorted(
+        name for name in os.listdir(versions_root) if os.path.isdir(os.path.join(versions_root, name))
+    )
+    report = VersionBuildReport()
+    rendered = {}  #source key -> page html with version variables unsubstituted
+    written = {}  #output hash -> first path written with those bytes
+
+    for version in versions:
+        version_dir = os.path.join(versions_root, version)
+        version_variables = {"Version": version, **(variables or {}).get(version, {})}
+        for rel_path in list_content(version_dir):
+            from_path = os.path.join(version_dir, rel_path)
+            key, markdown = includes.content_key(from_path)
+            report.pages += 1
+            page = rendered.get(key)
+            if page is None:
+                _, page = render_page(markdown, template, includes=includes, path=from_path)
+                rendered[key] = page
+                report.rendered += 1
+
+            output = substitute(page, version_variables).encode("utf-8")
+            output_hash = hashlib.sha256(output).hexdigest()
+            dest_path = page_dest_path(rel_path, os.path.join(dest_dir_path, version))
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            if output_hash in written:
+                link_or_copy(written[output_hash], dest_path)
+                report.linked += 1
+            else:
+                # Never write through a hard link left by a previous build
+                if os.path.exists(dest_path):
+                    os.remove(dest_path)
+                with open(dest_path, "wb") as f:
+                    f.write(output)
+                written[output_hash] = dest_path
+                report.written += 1
+    return report
@@ -0,0 +1,237 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from docast import parse_document, to_html
+from headings import HeadingCollector
+from highlight import use_cache_dir
+
+
+def render_request(markdown, options):
+    #Top-level so it can run in a process pool
+    headings = HeadingCollector()
+    html = to_html(parse_document(markdown, headings))
+    response = {"html": html}
+    if options.get("toc"):
+        response["toc"] = headings.toc_html()
+    return response
+
+
+class ConversionWorker:
+    #Long-lived converter for JSON-lines requests. Rendered results are cached
+    #by (markdown hash, options) across requests, and per-request latency is
+    #kept for the most recent requests so stats can be reported on demand.
+    def __init__(
+        self, workers=4, processes=False, batch_size=32, cache_size=1024, latency_window=10000,
+        highlight_cache_dir=None,
+    ):
+        if processes:
+            #spawn rather than fork: the stream reader thread may hold locks.
+            #Each process installs its own highlight cache on start.
+            self.executor = ProcessPoolExecutor(
+                workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=use_cache_dir,
+                initargs=(highlight_cache_dir,),
+            )
+        else:
+            use_cache_dir(highlight_cache_dir)
+            self.executor = ThreadPoolExecutor(workers)
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.requests = 0
+        self.latencies = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.executor.shutdown()
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+            return {
+                "requests": self.requests,
+                "p50_ms": percentile(latencies, 0.50) * 1000,
+                "p99_ms": percentile(latencies, 0.99) * 1000,
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+            }
+
+    def _cache_key(self, request):
+        options = json.dumps(request.get("options") or {}, sort_keys=True)
+        digest = hashlib.sha1(request["markdown"].encode("utf-8")).hexdigest()
+        return digest, options
+
+    def handle_batch(self, lines, received=None):
+        #Converts a batch of request lines and returns the response dicts in
+        #order. received holds each line's arrival time for the latency stats.
+        if received is None:
+            received = [time.perf_counter()] * len(lines)
+        responses = [None] * len(lines)
+        pending = {}
+        for i, line in enumerate(lines):
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                responses[i] = {"id": None, "error": f"invalid json: {e}"}
+                continue
+            if not isinstance(request, dict):
+                responses[i] = {"id": None, "error": "request must be a json object"}
+                continue
+            if request.get("stats"):
+                #Filled in last so the stats include the rest of this batch
+                responses[i] = {"id": request.get("id"), "stats": None}
+                continue
+            if not isinstance(request.get("markdown"), str):
+                responses[i] = {"id": request.get("id"), "error": "markdown must be a string"}
+                continue
+            if not isinstance(request.get("options") or {}, dict):
+                responses[i] = {"id": request.get("id"), "error": "options must be an object"}
+                continue
+            key = self._cache_key(request)
+            with self._lock:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    self.cache.move_to_end(key)
+                    self.cache_hits += 1
+            if cached is not None:
+                responses[i] = {"id": request.get("id"), **cached}
+            else:
+                future = pending.get(key)
+                if future is None:
+                    future = self.executor.submit(render_request, request["markdown"], request.get("options") or {})
+                    pending[key] = future
+                responses[i] = (request.get("id"), key, future)
+
+        for i, response in enumerate(responses):
+            if not isinstance(response, tuple):
+                continue
+            request_id, key, future = response
+            try:
+                result = future.result()
+            except Exception as e:
+                responses[i] = {"id": request_id, "error": str(e)}
+                continue
+            with self._lock:
+                if key not in self.cache:
+                    self.cache_misses += 1
+                    self.cache[key] = result
+                    while len(self.cache) > self.cache_size:
+                        self.cache.popitem(last=False)
+            responses[i] = {"id": request_id, **result}
+
+        finished = time.perf_counter()
+        with self._lock:
+            for response, start in zip(responses, received):
+                if "stats" not in response:
+                    self.requests += 1
+                    self.latencies.append(finished - start)
+        for response in responses:
+            if "stats" in response:
+                response["stats"] = self.stats()
+        return responses
+
+    def serve_stream(self, rfile, wfile):
+        #Reads request lines on a background thread and converts whatever has
+        #queued up (up to batch_size) as one batch, writing one line per response
+        lines = queue.Queue()
+
+        def read_lines():
+            #Invalid utf-8 becomes U+FFFD, so the line still gets a response
+            #(an invalid json error at worst), and the sentinel is always sent
+            #so the writer below never waits on a dead reader
+            try:
+                for line in rfile:
+                    if isinstance(line, bytes):
+                        line = line.decode("utf-8", errors="replace")
+                    if line.strip():
+                        lines.put((line, time.perf_counter()))
+            finally:
+                lines.put(None)
+
+        threading.Thread(target=read_lines, daemon=True).start()
+        done = False
+        while not done:
+            item = lines.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = lines.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+            responses = self.handle_batch([line for line, _ in batch], [start for _, start in batch])
+            output = "".join(json.dumps(response) + "\n" for response in responses)
+            if hasattr(wfile, "encoding"):
+                wfile.write(output)
+            else:
+                wfile.write(output.encode("utf-8"))
+            wfile.flush()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def serve_unix_socket(worker, path):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            worker.serve_stream(self.rfile, self.wfile)
+
+    if os.path.exists(path):
+        os.remove(path)
+    server = socketserver.ThreadingUnixStreamServer(path, Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert markdown to html from JSON-lines requests")
+    parser.add_argument("--socket", help="listen on this unix socket instead of stdin/stdout")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--processes", action="store_true", help="use a process pool instead of threads")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--highlight-cache", default="./.cache/highlight", help="directory for cached code highlighting")
+    args = parser.parse_args()
+
+    worker = ConversionWorker(
+        args.workers, args.processes, args.batch_size, highlight_cache_dir=args.highlight_cache
+    )
+    try:
+        if args.socket:
+            server = serve_unix_socket(worker, args.socket)
+            print(f"Listening on {args.socket}", file=sys.stderr)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+        else:
+            sys.stdin.reconfigure(errors="replace")
+            worker.serve_stream(sys.stdin, sys.stdout)
+    finally:
+        worker.close()
+
+
+if __name__ == "__main__":
+    main()